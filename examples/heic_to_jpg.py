@@ -49,11 +49,44 @@ def convert_heic_to_jpg(heic_file: str, output_dir: str = "converted"):
     return success
 
 
+def convert_heic_folder_to_jpg(heic_dir: str, output_dir: str = "converted"):
+    """Convert every HEIC file in a folder to JPEG using all CPU cores"""
+    
+    converter = PhotoConverter()
+    
+    if '.heic' not in converter.SUPPORTED_FORMATS:
+        print("Error: HEIC support not available. Please install pillow-heif:")
+        print("pip install pillow-heif")
+        return False
+    
+    input_dir = Path(heic_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    heic_files = [f for f in converter.get_image_files(input_dir)
+                  if f.suffix.lower() in ('.heic', '.heif')]
+    pairs = [(f, output_dir / f"{f.stem}.jpg") for f in heic_files]
+    
+    print(f"Converting {len(pairs)} HEIC files from {input_dir} to {output_dir}...")
+    
+    # convert_many spreads the work over a process pool (one worker per CPU)
+    for result in converter.convert_many(pairs, quality=95):
+        status = "✅" if result.success else "❌"
+        print(f"{status} {result.input_path.name}")
+    
+    print(f"Converted: {converter.converted_count}, failed: {converter.failed_count}")
+    return converter.failed_count == 0
+
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
-        print("Usage: python heic_to_jpg.py <input_heic_file>")
+        print("Usage: python heic_to_jpg.py <input_heic_file_or_folder>")
         print("Example: python heic_to_jpg.py photo.heic")
+        print("Example: python heic_to_jpg.py ~/Pictures/From-iPhone")
         sys.exit(1)
     
-    heic_file = sys.argv[1]
-    convert_heic_to_jpg(heic_file)
\ No newline at end of file
+    heic_path = sys.argv[1]
+    if Path(heic_path).is_dir():
+        convert_heic_folder_to_jpg(heic_path)
+    else:
+        convert_heic_to_jpg(heic_path)
\ No newline at end of file
@@ -21,7 +21,9 @@ setup(
     url="https://github.com/acidbathbob/photo-converter",
     packages=find_packages(),
     package_dir={"": "src"},
-    py_modules=["photo_converter", "photo_converter_gui"],
+    py_modules=["photo_converter", "photo_converter_gui", "photo_converter_bench",
+                "photo_converter_cache", "photo_converter_metrics", "photo_converter_probe",
+                "photo_converter_server", "photo_converter_thumbs", "photo_converter_tuning"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
@@ -44,8 +46,12 @@ setup(
         "pillow-heif>=1.1.0",
     ],
     extras_require={
+        "yaml": [
+            "PyYAML>=6.0",
+        ],
         "dev": [
             "pytest>=6.0",
+            "pytest-benchmark>=4.0",
             "black>=22.0",
             "flake8>=4.0",
         ]
@@ -3,31 +3,707 @@
 Photo Converter - A simple tool for converting images between different formats
 """
 
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import hashlib
+import importlib.util
+import io
+import itertools
+import json
 import os
+import signal
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 import click
-from PIL import Image
-from tqdm import tqdm
-
-# Import pillow-heif for HEIC support (more compatible than pyheif)
-try:
-    from pillow_heif import register_heif_opener
-    register_heif_opener()
-    HEIC_SUPPORTED = True
-except ImportError:
-    # Fallback to pyheif if available
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Pillow, tqdm, PyYAML and the HEIF plugins are imported where they are first
+# needed, so that --help, scans and up-to-date incremental runs start quickly
+# (measure with `photo_converter.py bench --startup`). Availability is checked
+# without importing anything.
+
+# HEIC support: pillow-heif (more compatible) or, failing that, pyheif.
+# register_heif() switches to pyheif if pillow-heif turns out not to import.
+PYHEIF_INSTALLED = importlib.util.find_spec('pyheif') is not None
+HEIC_SUPPORTED = importlib.util.find_spec('pillow_heif') is not None
+USE_PYHEIF = False
+if not HEIC_SUPPORTED:
+    HEIC_SUPPORTED = USE_PYHEIF = PYHEIF_INSTALLED
+
+YAML_SUPPORTED = importlib.util.find_spec('yaml') is not None
+
+HEIF_EXTENSIONS = ('.heic', '.heif')
+_heif_registered = False
+
+
+def register_heif() -> bool:
+    """Register the pillow-heif opener with Pillow (once, on first use).
+
+    If pillow-heif is installed but fails to import (ABI mismatch, missing
+    libheif), HEIF files go through pyheif instead when it is installed.
+    Returns whether Pillow can now open HEIF files by itself.
+    """
+    global _heif_registered, HEIC_SUPPORTED, USE_PYHEIF
+    if not _heif_registered and HEIC_SUPPORTED and not USE_PYHEIF:
+        try:
+            from pillow_heif import register_heif_opener
+        except ImportError:
+            HEIC_SUPPORTED = USE_PYHEIF = PYHEIF_INSTALLED
+            return False
+        register_heif_opener()
+        _heif_registered = True
+    return _heif_registered
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """Parse a WIDTHxHEIGHT string such as '800x600'"""
+    width, height = map(int, text.lower().split('x'))
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Size must be positive: {text}")
+    return width, height
+
+
+def parse_resize(text: str, mode: str = 'exact') -> Tuple[Optional[int], Optional[int]]:
+    """Parse a --resize value for the given resize mode.
+
+    Accepts WIDTHxHEIGHT, WIDTHx / xHEIGHT (one side only; the other side
+    then follows the aspect ratio) and, for ``max-pixels``, a plain pixel
+    count such as 2000000.
+    """
+    text = text.strip().lower()
+    if mode == 'max-pixels' and 'x' not in text:
+        pixels = int(text)
+        if pixels <= 0:
+            raise ValueError(f"Size must be positive: {text}")
+        return pixels, 1
+    width_text, height_text = text.split('x')
+    width = int(width_text) if width_text else None
+    height = int(height_text) if height_text else None
+    check_resize((width, height), mode)
+    return width, height
+
+
+def check_resize(resize: Tuple[Optional[int], Optional[int]], mode: str = 'exact'):
+    """Raise ValueError unless a resize box has positive sides and every side its mode needs"""
+    width, height = resize
+    if width is None and height is None:
+        raise ValueError("Size is empty")
+    if (width is not None and width <= 0) or (height is not None and height <= 0):
+        raise ValueError(f"Size must be positive: {width}x{height}")
+    if mode == 'width' and width is None or mode == 'height' and height is None:
+        raise ValueError(f"Resize mode '{mode}' needs a {mode}")
+    if mode in ('fill', 'max-pixels') and (width is None or height is None):
+        raise ValueError(f"Resize mode '{mode}' needs both width and height")
+
+
+# How --resize WIDTHxHEIGHT is applied:
+#   exact      - exactly WIDTHxHEIGHT (may distort the aspect ratio; with one
+#                side only, the other follows the aspect ratio)
+#   fit        - as large as possible within the box, aspect preserved
+#   fill       - cover the box, aspect preserved, centre-cropped to WIDTHxHEIGHT
+#   width      - WIDTH wide, height follows the aspect ratio
+#   height     - HEIGHT tall, width follows the aspect ratio
+#   max-pixels - shrink (never enlarge) to at most WIDTH*HEIGHT pixels
+RESIZE_MODES = ('exact', 'fit', 'fill', 'width', 'height', 'max-pixels')
+
+# Resampling filter names -> Image.Resampling members (looked up lazily)
+RESAMPLE_FILTERS = {
+    'nearest': 'NEAREST',
+    'box': 'BOX',
+    'bilinear': 'BILINEAR',
+    'hamming': 'HAMMING',
+    'bicubic': 'BICUBIC',
+    'lanczos': 'LANCZOS',
+}
+
+# Encoder profiles: Pillow save options per output format
+#   fast     - single-pass encodes for bulk ingest (no Huffman optimisation,
+#              fastest WebP method, light PNG compression, uncompressed TIFF)
+#   balanced - the historical defaults (optimised JPEG Huffman tables)
+#   smallest - smallest files for publishing (progressive JPEG, slowest WebP
+#              method, optimised PNG, deflate TIFF)
+ENCODER_PROFILES = {
+    'fast': {
+        'JPEG': {'optimize': False},
+        'WEBP': {'method': 0},
+        'PNG': {'compress_level': 1},
+        'TIFF': {'compression': 'raw'},
+    },
+    'balanced': {
+        # optimize=True is added only for an explicit quality (see _save_image)
+        'JPEG': {},
+        'WEBP': {'method': 4},
+        'PNG': {'compress_level': 6},
+        'TIFF': {'compression': 'raw'},
+    },
+    'smallest': {
+        'JPEG': {'optimize': True, 'progressive': True},
+        'WEBP': {'method': 6},
+        'PNG': {'optimize': True},
+        'TIFF': {'compression': 'tiff_adobe_deflate'},
+    },
+}
+
+# Individual encoder overrides: option name -> (format, Pillow save option)
+ENCODER_OPTIONS = {
+    'progressive': ('JPEG', 'progressive'),
+    'subsampling': ('JPEG', 'subsampling'),
+    'webp_method': ('WEBP', 'method'),
+    'webp_lossless': ('WEBP', 'lossless'),
+    'png_compress_level': ('PNG', 'compress_level'),
+    'tiff_compression': ('TIFF', 'compression'),
+}
+
+JPEG_SUBSAMPLING = ('4:4:4', '4:2:2', '4:2:0')
+TIFF_COMPRESSIONS = ('raw', 'tiff_lzw', 'tiff_adobe_deflate', 'packbits', 'jpeg')
+
+
+def encoder_save_options(format_name: str, profile: str = 'balanced',
+                         overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Pillow save options for a format under an encoder profile plus overrides"""
+    options = dict(ENCODER_PROFILES[profile].get(format_name, {}))
+    for name, value in (overrides or {}).items():
+        option_format, option = ENCODER_OPTIONS[name]
+        if option_format == format_name and value is not None:
+            options[option] = value
+    return options
+
+
+def target_size(source_size: Tuple[int, int], resize: Tuple[Optional[int], Optional[int]],
+                mode: str = 'exact') -> Tuple[int, int]:
+    """Compute the output size for a source size, resize box and resize mode"""
+    src_width, src_height = source_size
+    width, height = resize
+    if mode in ('exact', 'fill'):
+        if width is not None and height is not None:
+            return width, height
+        # Only one side given: keep the aspect ratio
+        mode = 'fit'
+    if mode == 'max-pixels':
+        budget = width * height
+        if src_width * src_height <= budget:
+            return src_width, src_height
+        scale = (budget / (src_width * src_height)) ** 0.5
+    elif mode == 'width' or (mode == 'fit' and height is None):
+        scale = width / src_width
+    elif mode == 'height' or (mode == 'fit' and width is None):
+        scale = height / src_height
+    elif mode == 'fit':
+        scale = min(width / src_width, height / src_height)
+    else:
+        raise ValueError(f"Unknown resize mode '{mode}'")
+    return max(1, round(src_width * scale)), max(1, round(src_height * scale))
+
+
+def fill_crop_box(source_size: Tuple[int, int], size: Tuple[int, int]) -> Tuple[float, float, float, float]:
+    """Centred region of source_size with the aspect ratio of size"""
+    src_width, src_height = source_size
+    target_ratio = size[0] / size[1]
+    if src_width / src_height > target_ratio:
+        crop_width = src_height * target_ratio
+        left = (src_width - crop_width) / 2
+        return left, 0, left + crop_width, src_height
+    crop_height = src_width / target_ratio
+    top = (src_height - crop_height) / 2
+    return 0, top, src_width, top + crop_height
+
+
+class Rendition(NamedTuple):
+    """One output produced from a decoded source (e.g. thumbnail, web, full)"""
+    name: str
+    extension: str
+    resize: Optional[Tuple[int, int]] = None
+    quality: Optional[int] = None
+    resize_mode: Optional[str] = None
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'Rendition':
+        """Parse NAME:FORMAT[:WIDTHxHEIGHT][:QUALITY], e.g. 'thumb:webp:320x320:80'"""
+        parts = spec.split(':')
+        if len(parts) < 2 or len(parts) > 4 or not parts[0] or not parts[1]:
+            raise ValueError(f"Invalid rendition '{spec}'. Use NAME:FORMAT[:WIDTHxHEIGHT][:QUALITY]")
+        return cls.from_dict({
+            'name': parts[0],
+            'format': parts[1],
+            'size': parts[2] if len(parts) > 2 and parts[2] else None,
+            'quality': parts[3] if len(parts) > 3 and parts[3] else None,
+        })
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Rendition':
+        """Build a rendition from a preset-file entry"""
+        extension = str(data['format']).lower()
+        if not extension.startswith('.'):
+            extension = '.' + extension
+        resize_mode = data.get('mode')
+        if resize_mode is not None and resize_mode not in RESIZE_MODES:
+            raise ValueError(f"Unknown resize mode '{resize_mode}'")
+        size = data.get('size')
+        if isinstance(size, (str, int)):
+            size = parse_resize(str(size), resize_mode or 'fit')
+        elif size is not None:
+            size = tuple(int(side) if side else None for side in size)
+            if len(size) != 2:
+                raise ValueError(f"Invalid rendition size {data.get('size')!r}")
+            check_resize(size, resize_mode or 'exact')
+        quality = data.get('quality')
+        if quality is not None:
+            quality = int(quality)
+            if not (1 <= quality <= 100):
+                raise ValueError("Quality must be between 1 and 100")
+        return cls(str(data['name']), extension, size, quality, resize_mode)
+
+
+def load_renditions(path: Path) -> List[Rendition]:
+    """Load renditions from a JSON or YAML preset file.
+
+    The file holds either a list of renditions or a mapping with a
+    ``renditions`` key; each entry has ``name``, ``format`` and optional
+    ``size`` (``"WxH"`` or ``[w, h]``), ``mode`` (a resize mode) and ``quality``.
+    """
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        if not YAML_SUPPORTED:
+            raise ValueError("YAML presets require PyYAML (pip install pyyaml)")
+        import yaml
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('renditions', [])
+    return [Rendition.from_dict(entry) for entry in data]
+
+
+def rendition_path(base: Path, rendition: Rendition) -> Path:
+    """Output path of a rendition for a base path without extension"""
+    return base.with_name(f"{base.name}_{rendition.name}{rendition.extension}")
+
+
+def strip_jpeg_metadata(jpeg_data: bytes) -> bytes:
+    """Return a JPEG's bytes without EXIF/XMP and comments, without re-encoding.
+
+    EXIF/XMP and other APPn segments and comments are removed; the JFIF
+    header, the Adobe segment (it defines the colour transform) and any ICC
+    profile are kept. Everything from the first start-of-scan marker on
+    (the compressed image data) is copied byte for byte.
+
+    Raises ValueError for data that has no start-of-scan marker or doesn't
+    end with the end-of-image marker (a truncated file); such files should
+    go through the decoder, which reports the actual damage.
+    """
+    data = memoryview(jpeg_data)
+    if bytes(data[:2]) != b'\xff\xd8':
+        raise ValueError("Not a JPEG file")
+    
+    chunks = [data[:2]]
+    pos = 2
+    while True:
+        if pos + 4 > len(data):
+            raise ValueError("JPEG has no image data")
+        if data[pos] != 0xFF:
+            raise ValueError("Corrupt JPEG marker")
+        # Skip fill bytes before the marker code
+        while pos + 1 < len(data) and data[pos + 1] == 0xFF:
+            pos += 1
+        marker = data[pos + 1]
+        if marker == 0xDA:
+            # Start of scan: the rest is entropy-coded data (and, for
+            # progressive files, further tables and scans) - keep it all
+            if bytes(data[-2:]) != b'\xff\xd9':
+                raise ValueError("JPEG is truncated")
+            chunks.append(data[pos:])
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers without a length field
+            chunks.append(data[pos:pos + 2])
+            pos += 2
+            continue
+        length = (data[pos + 2] << 8) | data[pos + 3]
+        segment = data[pos:pos + 2 + length]
+        payload = bytes(segment[4:18])
+        keep = True
+        if marker == 0xFE:
+            keep = False
+        elif 0xE0 <= marker <= 0xEF:
+            keep = ((marker == 0xE0 and payload.startswith(b'JFIF\x00'))
+                    or (marker == 0xE2 and payload.startswith(b'ICC_PROFILE\x00'))
+                    or marker == 0xEE)
+        if keep:
+            chunks.append(segment)
+        pos += 2 + length
+    
+    return b''.join(chunks)
+
+
+@contextlib.contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """Temporary sibling of ``path`` that replaces it when the block succeeds.
+
+    On any error or interruption the temporary file is removed, so a
+    partial output never appears under the real name.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        import pyheif
-        HEIC_SUPPORTED = True
-        USE_PYHEIF = True
-    except ImportError:
-        HEIC_SUPPORTED = False
-        USE_PYHEIF = False
-else:
-    USE_PYHEIF = False
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write bytes via a temporary file and rename, so readers never see partial output"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+
+def parse_byte_size(text: str) -> int:
+    """Parse a byte size such as '2G', '512M', '1.5GB' or '1048576'"""
+    text = text.strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    multiplier = 1
+    if text and text[-1] in units:
+        multiplier = units[text[-1]]
+        text = text[:-1]
+    value = int(float(text) * multiplier)
+    if value <= 0:
+        raise ValueError("Size must be positive")
+    return value
+
+
+# Rough peak-memory multiplier over one decoded frame: the frame itself plus
+# a converted/flattened copy and the resize output
+DECODE_MEMORY_FACTOR = 2.5
+
+# Share of a batch memory budget set aside for prefetched source files
+PREFETCH_MEMORY_SHARE = 0.25
+
+
+def estimate_decoded_bytes(path: Path, data: Optional[bytes] = None) -> int:
+    """Estimate the memory needed to convert an image, from its header only"""
+    from PIL import Image
+    is_heif = path.suffix.lower() in HEIF_EXTENSIONS
+    if is_heif:
+        register_heif()
+    try:
+        if is_heif and USE_PYHEIF:
+            # Container header only; nothing is decoded
+            import pyheif
+            heif_image = pyheif.open_container(data if data is not None else str(path)).primary_image.image
+            width, height = heif_image.size
+            mode = heif_image.mode
+        else:
+            with Image.open(io.BytesIO(data) if data is not None else path) as img:
+                width, height = img.size
+                mode = img.mode
+        bytes_per_pixel = max(Image.getmodebands(mode), 3)
+        if mode.startswith('I;16') or mode in ('I', 'F'):
+            bytes_per_pixel = 4
+        return int(width * height * bytes_per_pixel * DECODE_MEMORY_FACTOR)
+    except Exception:
+        # Unreadable header: assume heavy compression
+        if data is not None:
+            return len(data) * 20
+        try:
+            return path.stat().st_size * 20
+        except OSError:
+            return 0
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of a single conversion produced by the batch engine"""
+    input_path: Path
+    output_path: Path
+    success: bool
+    metrics: Optional[Dict[str, Any]] = None
+    # SHA-256 of the source bytes that were converted (batches with hash_sources)
+    source_sha256: Optional[str] = None
+
+
+class BatchControl:
+    """Cooperative cancel/pause token for a running batch.
+    
+    ``convert_many`` checks it before starting each file: once cancelled
+    no new file is started and files already in progress finish (and are
+    yielded) normally; while paused nothing new starts until ``resume``.
+    Safe to use from other threads and from signal handlers.
+    """
+    
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+    
+    def cancel(self):
+        self._cancelled.set()
+        # Wake a paused batch so it can stop
+        self._running.set()
+    
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+    
+    def resume(self):
+        self._running.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+    
+    def wait_while_paused(self) -> bool:
+        """Block while paused; returns False if the batch was cancelled"""
+        while not self._running.wait(0.5):
+            pass
+        return not self.cancelled
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as M:SS or H:MM:SS"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class BatchProgress:
+    """Throughput and ETA of a running batch, fed with each ConversionResult.
+    
+    Input bytes come from the result's metrics when the converter collects
+    them, otherwise from the source file's size.
+    """
+    
+    def __init__(self, total: Optional[int] = None):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.started = time.perf_counter()
+    
+    def update(self, result: ConversionResult):
+        self.done += 1
+        if not result.success:
+            self.failed += 1
+        if result.metrics:
+            self.bytes_in += result.metrics['bytes_in']
+        else:
+            try:
+                self.bytes_in += result.input_path.stat().st_size
+            except OSError:
+                pass
+    
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+    
+    @property
+    def files_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+    
+    @property
+    def mb_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.bytes_in / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Seconds left at the current rate (None until the rate is known)"""
+        rate = self.files_per_sec
+        if self.total is None or not rate:
+            return None
+        return max(0, self.total - self.done) / rate
+    
+    def describe(self) -> str:
+        """One-line summary, e.g. '120/500 files · 8.2 files/s · 31.5 MB/s · ETA 0:46'"""
+        done = f"{self.done}/{self.total}" if self.total is not None else str(self.done)
+        parts = [f"{done} files", f"{self.files_per_sec:.1f} files/s", f"{self.mb_per_sec:.1f} MB/s"]
+        eta = self.eta_seconds
+        if eta is not None:
+            parts.append(f"ETA {format_duration(eta)}")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        return " · ".join(parts)
+
+
+class StageTimer:
+    """Accumulates wall and CPU time per conversion stage (decode, resize, ...)"""
+    
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+    
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+            totals['wall'] += time.perf_counter() - wall_start
+            totals['cpu'] += time.process_time() - cpu_start
+
+
+class _NullStageTimer:
+    """Stand-in for StageTimer when metrics are off (keeps the hot path cheap)"""
+    
+    _null = contextlib.nullcontext()
+    
+    def stage(self, name: str):
+        return self._null
+
+
+_NULL_TIMER = _NullStageTimer()
+
+
+# Per-process converter used by pool workers (created once per worker)
+_worker_converter = None
+
+
+def _read_and_hash(input_path: Path, input_data: Optional[bytes]) -> Tuple[Optional[bytes], Optional[str]]:
+    """Source bytes (read now if needed) and their SHA-256, so a file is read only once.
+    
+    A read error leaves both None; the conversion then reports it.
+    """
+    if input_data is None:
+        try:
+            input_data = input_path.read_bytes()
+        except OSError:
+            return None, None
+    return input_data, hashlib.sha256(input_data).hexdigest()
+
+
+def _convert_in_worker(input_path: Path, output_path: Path, convert_kwargs: dict,
+                       collect_metrics: bool = False, input_data: Optional[bytes] = None,
+                       capture_output: bool = False, hash_source: bool = False):
+    """Convert one file inside a pool worker process.
+
+    Returns (success, metrics, outputs, source_sha256); with ``capture_output``
+    the encoded files come back as (path, bytes) pairs for the parent to
+    write, and with ``hash_source`` the source's hash is computed from the
+    bytes that were converted.
+    """
+    global _worker_converter
+    if _worker_converter is None:
+        _worker_converter = PhotoConverter()
+    _worker_converter.collect_metrics = collect_metrics
+    source_sha256 = None
+    if hash_source:
+        input_data, source_sha256 = _read_and_hash(input_path, input_data)
+    outputs = []
+    sink = (lambda path, data: outputs.append((path, data))) if capture_output else None
+    success = _worker_converter.convert_image(input_path, output_path, input_data=input_data,
+                                              output_sink=sink, **convert_kwargs)
+    return success, _worker_converter.last_metrics, outputs, source_sha256
+
+
+def _ignore_interrupts():
+    """Pool worker initializer: let the parent decide what Ctrl+C and SIGTERM do.
+    
+    Without this every worker dies with KeyboardInterrupt mid-file, and
+    forked workers would run the parent's SIGTERM handler themselves; the
+    parent instead stops handing out work and lets in-flight files finish.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+class _WriteBehind:
+    """Writes encoded outputs on background threads (atomically).
+
+    Each conversion's outputs are written by one task; ``completed`` yields
+    the conversion results whose writes have finished.
+    """
+    
+    def __init__(self, threads: int):
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='write-behind')
+        self.limit = threads * 4
+        self.pending = {}
+    
+    @staticmethod
+    def _write_all(outputs: List[Tuple[Path, bytes]]):
+        for path, data in outputs:
+            write_atomic(path, data)
+    
+    def submit(self, outputs: List[Tuple[Path, bytes]], result: 'ConversionResult'):
+        self.pending[self.executor.submit(self._write_all, outputs)] = result
+    
+    def backlogged(self) -> bool:
+        return len(self.pending) >= self.limit
+    
+    def completed(self, block: bool = False) -> Iterator[Tuple['ConversionResult', Optional[BaseException]]]:
+        """Yield (result, write error or None) for finished writes"""
+        if not self.pending:
+            return
+        if block:
+            from concurrent.futures import FIRST_COMPLETED, wait
+            done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+        else:
+            done = [future for future in self.pending if future.done()]
+        for future in done:
+            yield self.pending.pop(future), future.exception()
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def _prefetch_sources(pairs: Iterable[Tuple[Path, Path]], depth: int, threads: int,
+                      max_bytes: Optional[int] = None) -> Iterator[Tuple[Path, Path, Optional[bytes]]]:
+    """Read the next ``depth`` source files ahead on background threads.
+
+    With ``max_bytes``, the files read ahead also stay within that many
+    bytes in total (by their size on disk; one file is always read).
+    Yields (input, output, bytes) in input order; bytes is None when the
+    read failed, so the converter reports the error itself.
+    """
+    def read(path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+    
+    def size(path: Path) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+    
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='prefetch') as executor:
+        window = []
+        window_bytes = 0
+        for input_path, output_path in pairs:
+            file_bytes = size(input_path) if max_bytes else 0
+            # Hand out the oldest reads until this one fits in the window
+            while window and (len(window) >= depth or
+                              (max_bytes and window_bytes + file_bytes > max_bytes)):
+                oldest_input, oldest_output, oldest_bytes, future = window.pop(0)
+                window_bytes -= oldest_bytes
+                yield oldest_input, oldest_output, future.result()
+            window.append((input_path, output_path, file_bytes, executor.submit(read, input_path)))
+            window_bytes += file_bytes
+        for input_path, output_path, _, future in window:
+            yield input_path, output_path, future.result()
+
+
+def default_worker_count() -> int:
+    """Default number of batch workers (one per CPU)"""
+    return os.cpu_count() or 1
 
 
 class PhotoConverter:
@@ -44,10 +720,15 @@ class PhotoConverter:
         '.tif': 'TIFF'
     }
     
-    def __init__(self):
+    def __init__(self, collect_metrics: bool = False):
         self.converted_count = 0
         self.failed_count = 0
         
+        # Opt-in per-stage timing; convert_image leaves the numbers for the
+        # last file in last_metrics
+        self.collect_metrics = collect_metrics
+        self.last_metrics: Optional[Dict[str, Any]] = None
+        
         # Add HEIC support if available
         if HEIC_SUPPORTED:
             self.SUPPORTED_FORMATS.update({
@@ -55,55 +736,186 @@ class PhotoConverter:
                 '.heif': 'HEIF'
             })
     
+    # Output formats without an alpha channel: transparent images are
+    # flattened onto the background colour
+    OPAQUE_FORMATS = ('JPEG',)
+    
+    # Output formats that keep 16-bit greyscale (others get it scaled to 8 bits)
+    HIGH_DEPTH_FORMATS = ('PNG', 'TIFF')
+    
+    # Decoder-side reduction modes used when downscaling:
+    #   exact    - full decode, single LANCZOS resample (slowest, reference quality)
+    #   balanced - reduced decode down to ~3x the target, then LANCZOS
+    #   fast     - reduced decode down to ~the target, then LANCZOS
+    DOWNSCALE_MODES = {
+        'exact': None,
+        'balanced': 3.0,
+        'fast': 1.0,
+    }
+    
     def convert_image(self, input_path: Path, output_path: Path, 
-                     quality: Optional[int] = None, resize: Optional[tuple] = None) -> bool:
-        """Convert a single image file"""
-        try:
-            # Handle HEIC files - pillow-heif allows direct Image.open() usage
-            if input_path.suffix.lower() in ['.heic', '.heif'] and HEIC_SUPPORTED and USE_PYHEIF:
-                # Fallback to pyheif method if pillow-heif not available
-                import pyheif
-                heif_file = pyheif.read(str(input_path))
-                img = Image.frombytes(
-                    heif_file.mode,
-                    heif_file.size,
-                    heif_file.data,
-                    "raw",
-                    heif_file.mode,
-                    heif_file.stride,
-                )
+                     quality: Optional[int] = None, resize: Optional[tuple] = None,
+                     downscale: str = 'balanced',
+                     renditions: Optional[List['Rendition']] = None,
+                     resize_mode: str = 'exact', resample: str = 'lanczos',
+                     lossless: bool = True, input_data: Optional[bytes] = None,
+                     output_sink: Optional[Callable[[Path, bytes], None]] = None,
+                     target_bytes: Optional[int] = None, target_ssim: Optional[float] = None,
+                     tune_cache: Optional[str] = None, encoder_profile: str = 'balanced',
+                     encoder_options: Optional[Dict[str, Any]] = None,
+                     output_cache: Optional[str] = None, cache_link: bool = False,
+                     background: Tuple[int, int, int] = (255, 255, 255)) -> bool:
+        """Convert a single image file.
+
+        ``resize`` is a (width, height) box applied according to
+        ``resize_mode`` (see ``RESIZE_MODES``) with the ``resample`` filter.
+
+        When ``renditions`` is given the source is decoded once and every
+        rendition is written to ``rendition_path(output_path, rendition)``;
+        ``output_path`` is then a base path without extension. Renditions
+        without their own size/mode/quality fall back to ``resize``/
+        ``resize_mode``/``quality``.
+
+        With ``lossless`` set, a JPEG -> JPEG conversion that needs no pixel
+        change (no resize, quality, renditions, encoder options or
+        non-default profile) copies the compressed data instead of
+        re-encoding it. EXIF/XMP and comments are dropped as in the normal
+        pipeline, but an embedded ICC profile is kept (re-encoding drops it).
+
+        ``target_bytes`` / ``target_ssim`` pick the JPEG/WebP quality per
+        image by binary search on in-memory encodes (SSIM on a small probe),
+        caching results in memory and in the ``tune_cache`` SQLite file.
+
+        ``encoder_profile`` selects save options from ``ENCODER_PROFILES``;
+        ``encoder_options`` overrides individual ones (see ``ENCODER_OPTIONS``).
+
+        Transparent images written to formats without alpha (JPEG) are
+        flattened onto ``background``, an (R, G, B) colour.
+
+        ``output_cache`` names a shared cache directory (see ``OutputCache``
+        in photo_converter_cache): a conversion already done with the same
+        source bytes and options is copied (or, with ``cache_link``,
+        hard-linked) from it without decoding.
+
+        ``input_data`` supplies the source bytes when they were already read
+        (``input_path`` then only names the file), and ``output_sink``
+        receives each encoded output as ``(path, bytes)`` instead of it
+        being written to disk.
+        """
+        timer = StageTimer() if self.collect_metrics else _NULL_TIMER
+        self.last_metrics = None
+        outputs_written = []
+        try:
+            reducing_gap = self.DOWNSCALE_MODES[downscale]
+            from PIL import Image
+            resample_filter = getattr(Image.Resampling, RESAMPLE_FILTERS[resample])
+            
+            if renditions:
+                targets = [(rendition_path(output_path, r),
+                            r.quality if r.quality is not None else quality,
+                            r.resize or resize,
+                            r.resize_mode or resize_mode) for r in renditions]
             else:
-                # For all formats including HEIC (when using pillow-heif)
-                img = Image.open(input_path)
+                targets = [(output_path, quality, resize, resize_mode)]
+            
+            if output_cache:
+                with timer.stage('cache'):
+                    if input_data is None:
+                        input_data = input_path.read_bytes()
+                    cache = self._output_cache(output_cache, cache_link)
+                    cache_key = cache.key(input_data, {
+                        'quality': quality, 'resize': resize, 'downscale': downscale,
+                        'renditions': renditions, 'resize_mode': resize_mode, 'resample': resample,
+                        'lossless': lossless, 'target_bytes': target_bytes, 'target_ssim': target_ssim,
+                        'encoder_profile': encoder_profile, 'encoder_options': encoder_options,
+                        'background': background, 'outputs': [target[0].suffix.lower() for target in targets],
+                    })
+                    cached = cache.fetch(cache_key, len(targets))
+                    if cached:
+                        for (target_path, *_), cached_path in zip(targets, cached):
+                            if output_sink:
+                                data = cached_path.read_bytes()
+                                output_sink(target_path, data)
+                                outputs_written.append((target_path, len(data)))
+                            else:
+                                cache.place(cached_path, target_path)
+                                outputs_written.append((target_path, None))
+                if cached:
+                    self.converted_count += 1
+                    return True
+                output_sink = self._caching_sink(cache, cache_key, targets, output_sink)
+            
+            with timer.stage('open'):
+                img = self.open_image(input_path, input_data)
             
             with img:
-                # Convert to RGB if necessary (especially important for HEIC files)
-                if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
-                    img = img.convert('RGB')
+                # Same codec and no pixel change: skip decode/encode entirely
+                if (lossless and not renditions and not resize and not quality
+                        and not target_bytes and not target_ssim and not self._jpeg_overrides(encoder_profile, encoder_options)
+                        and img.format == 'JPEG' and img.mode in ('RGB', 'L')
+                        and output_path.suffix.lower() in ('.jpg', '.jpeg')):
+                    with timer.stage('copy'):
+                        try:
+                            data = strip_jpeg_metadata(input_data if input_data is not None
+                                                       else input_path.read_bytes())
+                        except ValueError:
+                            # Damaged or truncated: let the decoder report it
+                            data = None
+                        if data is not None:
+                            if output_sink:
+                                output_sink(output_path, data)
+                            else:
+                                write_atomic(output_path, data)
+                    if data is not None:
+                        outputs_written.append((output_path, len(data)))
+                        self.converted_count += 1
+                        return True
                 
-                # Handle transparency for formats that don't support it
-                if output_path.suffix.lower() in ['.jpg', '.jpeg'] and img.mode in ('RGBA', 'LA'):
-                    # Create white background for transparent images when converting to JPEG
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        background.paste(img, mask=img.split()[-1])
-                    else:
-                        background.paste(img)
-                    img = background
+                # Work out final sizes from the header, before any pixels are decoded
+                planned = [(target_path, target_quality,
+                            target_size(img.size, box, mode) if box else None, mode)
+                           for target_path, target_quality, box, mode in targets]
                 
-                # Resize if specified
-                if resize:
-                    img = img.resize(resize, Image.Resampling.LANCZOS)
+                # Let the decoder do part of a downscale for us (JPEG DCT scaling,
+                # embedded HEIF thumbnails), unless some output needs the full image
+                if reducing_gap is not None and all(size for _, _, size, _ in planned):
+                    img.draft(None, (int(max(size[0] for _, _, size, _ in planned) * reducing_gap),
+                                     int(max(size[1] for _, _, size, _ in planned) * reducing_gap)))
                 
-                # Save with appropriate options
-                save_kwargs = {}
-                if output_path.suffix.lower() in ['.jpg', '.jpeg'] and quality:
-                    save_kwargs['quality'] = quality
-                    save_kwargs['optimize'] = True
-                elif output_path.suffix.lower() == '.webp' and quality:
-                    save_kwargs['quality'] = quality
+                with timer.stage('decode'):
+                    img.load()
+                
+                # Normalise palette, 16-bit, CMYK, premultiplied... modes (especially
+                # important for HEIC files) in one conversion, before resizing
+                if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    keep_16bit = all(self.SUPPORTED_FORMATS[target[0].suffix.lower()] in self.HIGH_DEPTH_FORMATS
+                                     for target in targets)
+                    with timer.stage('convert'):
+                        img = self.normalize_mode(img, keep_16bit)
+                
+                # Largest output first, so smaller ones can be resampled from
+                # an intermediate instead of the full-size image
+                planned.sort(key=lambda t: -(t[2][0] * t[2][1]) if t[2] else float('-inf'))
+                intermediates = [img]
+                for target_path, target_quality, size, mode in planned:
+                    frame = img
+                    # Resize if specified (before flattening, so that works on fewer pixels);
+                    # reducing_gap pre-shrinks with a cheap box reduce before the final filter
+                    if size and size != img.size:
+                        with timer.stage('resize'):
+                            frame = self._resample_source(intermediates, size, reducing_gap)
+                            if mode == 'fill':
+                                # Crop and resample in one pass; cropped frames can't be reused
+                                frame = frame.resize(size, resample_filter, box=fill_crop_box(frame.size, size),
+                                                     reducing_gap=reducing_gap)
+                            else:
+                                frame = frame.resize(size, resample_filter, reducing_gap=reducing_gap)
+                                intermediates.append(frame)
+                    written = self._save_image(frame, target_path, target_quality, timer, output_sink,
+                                               target_bytes, target_ssim, tune_cache,
+                                               encoder_profile, encoder_options, background)
+                    outputs_written.append((target_path, written))
                 
-                img.save(output_path, **save_kwargs)
                 self.converted_count += 1
                 return True
                 
@@ -111,28 +923,781 @@ class PhotoConverter:
             print(f"Error converting {input_path}: {e}")
             self.failed_count += 1
             return False
+        
+        finally:
+            if self.collect_metrics:
+                self.last_metrics = self._build_metrics(input_path, input_data, outputs_written, timer)
+    
+    @staticmethod
+    def _build_metrics(input_path: Path, input_data: Optional[bytes],
+                       outputs_written: List[Tuple[Path, Optional[int]]], timer: StageTimer) -> Dict[str, Any]:
+        """Summarise one conversion: per-stage times plus bytes read and written"""
+        def size_of(path: Path) -> int:
+            try:
+                return path.stat().st_size
+            except OSError:
+                return 0
+        
+        return {
+            'stages': timer.stages,
+            'bytes_in': len(input_data) if input_data is not None else size_of(input_path),
+            'bytes_out': sum(size if size is not None else size_of(path) for path, size in outputs_written),
+        }
+    
+    def open_image(self, input_path: Path, input_data: Optional[bytes] = None) -> Image.Image:
+        """Open an image without decoding its pixels where possible"""
+        from PIL import Image, UnidentifiedImageError
+        is_heif = input_path.suffix.lower() in HEIF_EXTENSIONS
+        
+        # For all formats including HEIC (when using pillow-heif, whose plugin
+        # decodes lazily, opens the primary image of multi-image containers
+        # and lets draft() pick an embedded thumbnail for reduced decoding)
+        if is_heif:
+            register_heif()
+            if USE_PYHEIF:
+                # Fallback to pyheif method if pillow-heif is not available
+                return self._open_pyheif(input_path, input_data)
+        source = io.BytesIO(input_data) if input_data is not None else input_path
+        try:
+            return Image.open(source)
+        except UnidentifiedImageError:
+            # HEIF content under another name (e.g. an upload): register and retry
+            if not _heif_registered and register_heif():
+                if input_data is not None:
+                    source.seek(0)
+                with contextlib.suppress(UnidentifiedImageError):
+                    return Image.open(source)
+        # Name the file rather than the in-memory buffer (prefetched or uploaded data)
+        raise UnidentifiedImageError(f"cannot identify image file {str(input_path)!r}")
+    
+    @staticmethod
+    def normalize_mode(img: Image.Image, keep_16bit: bool = False) -> Image.Image:
+        """Convert a decoded image to RGB, RGBA, L or LA (or keep I;16 when
+        every output can store it) with a single conversion"""
+        mode = img.mode
+        if mode in ('P', 'PA'):
+            # Keep palette transparency as a real alpha channel
+            has_alpha = mode == 'PA' or 'transparency' in img.info
+            return img.convert('RGBA' if has_alpha else 'RGB')
+        if mode in ('RGBa', 'La'):
+            # Premultiplied alpha: Pillow divides it back out
+            return img.convert(mode.upper())
+        if mode == '1':
+            return img.convert('L')
+        if mode.startswith('I;16') or mode == 'I':
+            if keep_16bit and mode == 'I;16':
+                return img
+            if mode != 'I':
+                img = img.convert('I')
+            # Scale 16-bit samples down to 8 bits instead of clipping them
+            return img.point(lambda value: value / 256).convert('L')
+        if mode == 'F':
+            return img.convert('L')
+        # CMYK, YCbCr, LAB, HSV, RGBX...
+        return img.convert('RGB')
+    
+    @staticmethod
+    def _flatten(img: Image.Image, background: Tuple[int, int, int]) -> Image.Image:
+        """Composite an RGBA/LA image onto a solid background colour"""
+        from PIL import Image
+        if img.mode == 'LA':
+            # Greyscale stays greyscale; ITU-R 601 luma of the background
+            red, green, blue = background
+            flat = Image.new('L', img.size, (red * 299 + green * 587 + blue * 114) // 1000)
+        else:
+            flat = Image.new('RGB', img.size, background)
+        # The image is its own mask (its alpha band): one pass, no channel split
+        flat.paste(img, mask=img)
+        return flat
+    
+    @staticmethod
+    def _open_pyheif(input_path: Path, input_data: Optional[bytes] = None) -> Image.Image:
+        """Decode the primary image of a HEIF file with pyheif.
+
+        Bursts and other multi-image containers convert their primary image;
+        the number of top-level images is kept in ``info['heif_images']``.
+        The decoder's buffer is wrapped with ``Image.frombuffer``: RGBA
+        images share it without a copy, RGB images (which Pillow stores
+        padded to 4 bytes per pixel) are copied once and the buffer is
+        released straight away. pyheif can't decode at a reduced size.
+        """
+        import pyheif
+        from PIL import Image
+        container = pyheif.open_container(input_data if input_data is not None else str(input_path))
+        heif_image = container.primary_image.image.load()
+        img = Image.frombuffer(heif_image.mode, heif_image.size, heif_image.data,
+                               'raw', heif_image.mode, heif_image.stride, 1)
+        img.info['heif_images'] = len(container.top_level_images)
+        return img
+    
+    @staticmethod
+    def _resample_source(intermediates: List[Image.Image], size: tuple,
+                         reducing_gap: Optional[float]) -> Image.Image:
+        """Pick the smallest already-computed image that is big enough to resample from"""
+        if reducing_gap is None:
+            # Exact mode always resamples from the full decode
+            return intermediates[0]
+        min_width = size[0] * max(reducing_gap, 2.0)
+        min_height = size[1] * max(reducing_gap, 2.0)
+        candidates = [im for im in intermediates if im.width >= min_width and im.height >= min_height]
+        if not candidates:
+            return intermediates[0]
+        return min(candidates, key=lambda im: im.width * im.height)
+    
+    def _save_image(self, img: Image.Image, output_path: Path, quality: Optional[int] = None,
+                    timer=_NULL_TIMER, output_sink: Optional[Callable[[Path, bytes], None]] = None,
+                    target_bytes: Optional[int] = None, target_ssim: Optional[float] = None,
+                    tune_cache: Optional[str] = None, encoder_profile: str = 'balanced',
+                    encoder_options: Optional[Dict[str, Any]] = None,
+                    background: Tuple[int, int, int] = (255, 255, 255)) -> Optional[int]:
+        """Flatten transparency if needed and save with format-specific options.
+
+        Returns the encoded size when it is known without a stat (sink or
+        quality search). ``target_bytes``/``target_ssim`` replace ``quality``
+        with a per-image search for JPEG and WebP outputs.
+        """
+        format_name = self.SUPPORTED_FORMATS[output_path.suffix.lower()]
+        
+        # Handle transparency for formats that don't support it
+        if format_name in self.OPAQUE_FORMATS and img.mode in ('RGBA', 'LA'):
+            with timer.stage('flatten'):
+                img = self._flatten(img, background)
+        
+        # Save with the encoder profile's options
+        save_kwargs = encoder_save_options(format_name, encoder_profile, encoder_options)
+        is_lossy = format_name in ('JPEG', 'WEBP')
+        if is_lossy and quality:
+            save_kwargs['quality'] = quality
+            # balanced spends the extra Huffman pass only when a quality is asked for
+            if format_name == 'JPEG' and encoder_profile == 'balanced':
+                save_kwargs.setdefault('optimize', True)
+        
+        # Per-image quality search for a size/SSIM target (JPEG and WebP only)
+        data = None
+        if is_lossy and (target_bytes or target_ssim):
+            with timer.stage('tune'):
+                tuned_quality, data = self._quality_tuner(tune_cache).choose(
+                    img, format_name, save_kwargs,
+                    target_bytes=target_bytes, target_ssim=target_ssim)
+            save_kwargs['quality'] = tuned_quality
+        
+        with timer.stage('encode'):
+            if data is None:
+                if output_sink is None:
+                    with atomic_path(output_path) as tmp_path:
+                        img.save(tmp_path, format=format_name, **save_kwargs)
+                    return None
+                buffer = io.BytesIO()
+                img.save(buffer, format=format_name, **save_kwargs)
+                data = buffer.getvalue()
+            if output_sink is None:
+                write_atomic(output_path, data)
+            else:
+                output_sink(output_path, data)
+        return len(data)
+    
+    @staticmethod
+    def _jpeg_overrides(encoder_profile: str, encoder_options: Optional[Dict[str, Any]]) -> bool:
+        """Whether a non-default profile or explicit JPEG encoder options ask for a re-encode"""
+        return encoder_profile != 'balanced' or any(value is not None and ENCODER_OPTIONS[name][0] == 'JPEG'
+                   for name, value in (encoder_options or {}).items())
+    
+    def _output_cache(self, cache_dir: str, link: bool = False):
+        """Output cache for a directory, created once per converter (and process)"""
+        from photo_converter_cache import OutputCache
+        if not hasattr(self, '_caches'):
+            self._caches = {}
+        if (cache_dir, link) not in self._caches:
+            self._caches[(cache_dir, link)] = OutputCache(Path(cache_dir), link=link)
+        return self._caches[(cache_dir, link)]
+    
+    @staticmethod
+    def _caching_sink(cache, cache_key: str, targets: List[tuple],
+                      output_sink: Optional[Callable[[Path, bytes], None]]) -> Callable[[Path, bytes], None]:
+        """Output sink that adds each output to the cache before passing it on"""
+        indexes = {target[0]: index for index, target in enumerate(targets)}
+        
+        def sink(path: Path, data: bytes):
+            cache.store(cache_key, indexes[path], data)
+            if output_sink:
+                output_sink(path, data)
+            else:
+                write_atomic(path, data)
+        return sink
+    
+    def _quality_tuner(self, cache_path: Optional[str] = None):
+        """Quality tuner for a cache file, created once per converter (and process)"""
+        from photo_converter_tuning import QualityTuner
+        if not hasattr(self, '_tuners'):
+            self._tuners = {}
+        if cache_path not in self._tuners:
+            self._tuners[cache_path] = QualityTuner(Path(cache_path) if cache_path else None)
+        return self._tuners[cache_path]
+    
+    def convert_bytes(self, data, output_format: str, source_name: str = 'input',
+                      **convert_kwargs) -> Optional[bytes]:
+        """Convert an image held in memory and return the encoded output.
+
+        ``data`` is any bytes-like object (bytes, bytearray, memoryview);
+        ``bytes`` are decoded in place, other types are copied once.
+        ``output_format`` is an extension or format name such as 'webp' or
+        '.jpg', and ``source_name`` only matters for decoders chosen by file name
+        (HEIC via pyheif). Other keyword arguments are passed on to
+        ``convert_image`` (renditions are not supported here).
+
+        Returns None when the conversion fails, like ``convert_image``
+        returning False.
+        """
+        outputs = []
+        success = self.convert_image(Path(source_name), Path('output' + self._output_extension(output_format)),
+                                     input_data=data, output_sink=lambda path, encoded: outputs.append(encoded),
+                                     **convert_kwargs)
+        return outputs[0] if success and outputs else None
+    
+    def convert_stream(self, source, destination, output_format: str,
+                       source_name: Optional[str] = None, **convert_kwargs) -> bool:
+        """Convert from a readable binary file object into a writable one.
+
+        The rest of the stream is read once into memory. ``source_name``
+        defaults to the stream's ``name`` attribute when it has one.
+        """
+        data = source.read()
+        if source_name is None:
+            source_name = os.path.basename(str(getattr(source, 'name', ''))) or 'input'
+        output = self.convert_bytes(data, output_format, source_name, **convert_kwargs)
+        if output is None:
+            return False
+        destination.write(output)
+        return True
     
-    def get_image_files(self, directory: Path) -> List[Path]:
+    def _output_extension(self, output_format: str) -> str:
+        """Normalise 'webp' / '.WEBP' / 'JPEG' to a supported extension"""
+        extension = output_format.lower() if output_format.startswith('.') else '.' + output_format.lower()
+        if extension not in self.SUPPORTED_FORMATS:
+            # Format names such as 'JPEG' or 'TIFF'
+            for candidate, format_name in self.SUPPORTED_FORMATS.items():
+                if format_name == output_format.upper():
+                    return candidate
+            raise ValueError(f"Unsupported output format: {output_format}")
+        return extension
+    
+    def convert_many(self, pairs: Iterable[Tuple[Path, Path]], workers: Optional[int] = None,
+                     max_memory: Optional[int] = None, prefetch: int = 0, write_threads: int = 0,
+                     control: Optional[BatchControl] = None, hash_sources: bool = False,
+                     **convert_kwargs) -> Iterator[ConversionResult]:
+        """Convert many (input, output) pairs, in parallel when workers > 1.
+
+        Results are yielded as soon as each file finishes (not necessarily in
+        input order) and ``converted_count`` / ``failed_count`` are updated on
+        this instance. Extra keyword arguments are passed to ``convert_image``.
+        When ``collect_metrics`` is set on this converter, each result carries
+        the file's stage timings.
+
+        ``max_memory`` (bytes) caps the estimated decoded size of the images
+        being converted at once: a file is only handed to a worker when it
+        fits in the budget left by those in flight (one file is always
+        admitted, however large, so the batch cannot stall).
+
+        For slow storage, ``prefetch`` reads that many upcoming source files
+        ahead on background threads (with ``max_memory``, a quarter of the
+        budget is set aside for them and the rest admits decodes), and ``write_threads`` > 0 moves output
+        writes (atomic temp file + rename) onto that many background threads,
+        so I/O overlaps with decoding and encoding.
+
+        ``control`` (a ``BatchControl``) cancels or pauses the batch: files
+        not yet started are skipped (or held back while paused), and files
+        in progress are finished and yielded. Outputs are always written
+        atomically, so a stopped batch never leaves partial files.
+
+        With ``hash_sources``, each result's ``source_sha256`` is computed
+        from the bytes read for the conversion (for ``ConversionManifest``),
+        so sources don't have to be read again afterwards.
+        """
+        if workers is None:
+            workers = default_worker_count()
+        
+        if prefetch > 0:
+            prefetch_bytes = int(max_memory * PREFETCH_MEMORY_SHARE) if max_memory else None
+            items = _prefetch_sources(pairs, prefetch, threads=max(2, min(prefetch, 8)),
+                                      max_bytes=prefetch_bytes)
+            if max_memory:
+                max_memory -= prefetch_bytes
+        else:
+            items = ((input_path, output_path, None) for input_path, output_path in pairs)
+        writer = _WriteBehind(write_threads) if write_threads > 0 else None
+        
+        try:
+            if workers <= 1:
+                results = self._convert_serial(items, writer, control, hash_sources, convert_kwargs)
+            else:
+                results = self._convert_parallel(items, workers, max_memory, writer, control, hash_sources,
+                                                 convert_kwargs)
+            for result, outputs in results:
+                if writer is None:
+                    yield result
+                    continue
+                writer.submit(outputs, result)
+                yield from self._finished_writes(writer, block=writer.backlogged())
+            
+            while writer is not None and writer.pending:
+                yield from self._finished_writes(writer, block=True)
+        finally:
+            # Stop prefetching sources that will not be converted
+            items.close()
+            if writer is not None:
+                writer.close()
+    
+    def _finished_writes(self, writer: _WriteBehind, block: bool) -> Iterator[ConversionResult]:
+        """Yield results whose outputs have been written, fixing counters on write errors"""
+        for result, error in writer.completed(block=block):
+            if error is not None and result.success:
+                print(f"Error writing {result.output_path}: {error}")
+                self.converted_count -= 1
+                self.failed_count += 1
+                result = result._replace(success=False)
+            yield result
+    
+    def _convert_serial(self, items, writer: Optional[_WriteBehind], control: Optional[BatchControl],
+                        hash_sources: bool, convert_kwargs: dict):
+        """In-process conversion loop for convert_many; yields (result, outputs)"""
+        for input_path, output_path, data in items:
+            if control is not None and not control.wait_while_paused():
+                break
+            source_sha256 = None
+            if hash_sources:
+                data, source_sha256 = _read_and_hash(input_path, data)
+            outputs = []
+            sink = (lambda path, encoded: outputs.append((path, encoded))) if writer else None
+            success = self.convert_image(input_path, output_path, input_data=data,
+                                         output_sink=sink, **convert_kwargs)
+            yield ConversionResult(input_path, output_path, success, self.last_metrics, source_sha256), outputs
+    
+    def _convert_parallel(self, items, workers: int, max_memory: Optional[int],
+                          writer: Optional[_WriteBehind], control: Optional[BatchControl],
+                          hash_sources: bool, convert_kwargs: dict):
+        """Process-pool conversion loop for convert_many; yields (result, outputs)"""
+        # Keep a bounded number of files in flight so lazily produced pairs are
+        # not all submitted (and held in memory) up front
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        
+        max_in_flight = workers * 2
+        items_iter = iter(items)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupts) as executor:
+            pending = {}
+            in_flight_bytes = 0
+            held = None  # next item, waiting for memory budget
+            try:
+                while True:
+                    # Cancelled or paused: start nothing new, keep collecting results
+                    stopped = control is not None and (control.cancelled or control.paused)
+                    while not stopped and len(pending) < max_in_flight:
+                        if held is None:
+                            try:
+                                input_path, output_path, data = next(items_iter)
+                            except StopIteration:
+                                break
+                            estimate = estimate_decoded_bytes(input_path, data) if max_memory else 0
+                            held = (input_path, output_path, data, estimate)
+                        
+                        input_path, output_path, data, estimate = held
+                        if max_memory and pending and in_flight_bytes + estimate > max_memory:
+                            # Over budget: wait for something to finish first
+                            break
+                        future = executor.submit(_convert_in_worker, input_path, output_path, convert_kwargs,
+                                                 self.collect_metrics, data, writer is not None, hash_sources)
+                        pending[future] = (input_path, output_path, estimate)
+                        in_flight_bytes += estimate
+                        held = None
+                    
+                    if not pending:
+                        if stopped and control.wait_while_paused():
+                            # Resumed
+                            continue
+                        break
+                    
+                    # With a control, wake up now and then to notice a resume
+                    done, _ = wait(pending, timeout=0.5 if control is not None else None,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        input_path, output_path, estimate = pending.pop(future)
+                        in_flight_bytes -= estimate
+                        metrics = source_sha256 = None
+                        outputs = []
+                        try:
+                            success, metrics, outputs, source_sha256 = future.result()
+                        except Exception as e:
+                            print(f"Error converting {input_path}: {e}")
+                            success = False
+                        
+                        if success:
+                            self.converted_count += 1
+                        else:
+                            self.failed_count += 1
+                        yield ConversionResult(input_path, output_path, success, metrics, source_sha256), outputs
+            finally:
+                # Interrupted: drop queued files and let the running ones finish
+                for future in pending:
+                    future.cancel()
+    
+    def iter_image_files(self, directory: Path, recursive: bool = False,
+                         include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                         max_depth: Optional[int] = None,
+                         skip_dirs: Optional[Iterable[Path]] = None) -> Iterator[Path]:
+        """Lazily yield supported image files found under a directory.
+
+        Walks the tree with a single ``os.scandir`` pass per directory, so
+        files are yielded while the rest of the tree is still being scanned.
+        ``include``/``exclude`` are glob patterns matched against the file
+        name and the path relative to ``directory``; ``exclude`` also prunes
+        directories. ``max_depth`` limits recursion (0 = top level only) and
+        ``skip_dirs`` are directories never descended into (e.g. the output).
+        """
+        supported = {ext.lower() for ext in self.SUPPORTED_FORMATS}
+        root = os.fspath(directory)
+        skip = {os.path.abspath(d) for d in (skip_dirs or ())}
+        visited = set()
+        
+        def matches(name: str, rel_path: str, patterns: List[str]) -> bool:
+            return any(fnmatch.fnmatch(name, pat) or fnmatch.fnmatch(rel_path, pat) for pat in patterns)
+        
+        stack = [(root, 0)]
+        while stack:
+            current, depth = stack.pop()
+            try:
+                # Guard against symlink loops and bind mounts visiting a directory twice
+                stat = os.stat(current)
+                key = (stat.st_dev, stat.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                try:
+                    if entry.is_dir():
+                        if (recursive and (max_depth is None or depth < max_depth)
+                                and os.path.abspath(entry.path) not in skip
+                                and not (exclude and matches(entry.name, rel_path, exclude))):
+                            subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                
+                if os.path.splitext(entry.name)[1].lower() not in supported:
+                    continue
+                if include and not matches(entry.name, rel_path, include):
+                    continue
+                if exclude and matches(entry.name, rel_path, exclude):
+                    continue
+                yield Path(entry.path)
+            
+            # Depth-first, in name order
+            stack.extend((d, depth + 1) for d in reversed(subdirs))
+    
+    def get_image_files(self, directory: Path, **scan_kwargs) -> List[Path]:
         """Get all image files from a directory"""
-        image_files = []
-        for ext in self.SUPPORTED_FORMATS.keys():
-            image_files.extend(directory.glob(f"*{ext}"))
-            image_files.extend(directory.glob(f"*{ext.upper()}"))
-        return sorted(image_files)
+        return sorted(self.iter_image_files(directory, **scan_kwargs))
+
+
+class OutputPlanner:
+    """Decides where each batch output goes and resolves name collisions.
+
+    ``layout`` is ``flat`` (every output directly in the output directory)
+    or ``mirror`` (keep each source's path relative to ``input_root``).
+    When two sources of the same run map to the same output name,
+    ``on_collision`` decides what happens to the later one:
+
+      suffix    - append _1, _2, ... to the stem
+      skip      - do not convert it
+      overwrite - let it overwrite the earlier output (legacy behaviour)
+      hash      - append a short hash of its source path to the stem
+
+    Names are compared case-insensitively so plans are safe on
+    case-insensitive filesystems too. Output directories are created as
+    they are planned unless ``create_dirs`` is off (dry runs).
+    """
+    
+    LAYOUTS = ('flat', 'mirror')
+    COLLISION_POLICIES = ('suffix', 'skip', 'overwrite', 'hash')
+    
+    def __init__(self, output_root: Path, extension: str, input_root: Optional[Path] = None,
+                 layout: str = 'flat', on_collision: str = 'suffix', create_dirs: bool = True):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'")
+        if on_collision not in self.COLLISION_POLICIES:
+            raise ValueError(f"Unknown collision policy '{on_collision}'")
+        if layout == 'mirror' and input_root is None:
+            raise ValueError("Mirror layout requires an input root")
+        self.output_root = output_root
+        self.extension = extension.lower()
+        self.input_root = input_root
+        self.layout = layout
+        self.on_collision = on_collision
+        self.collision_count = 0
+        self.create_dirs = create_dirs
+        self._claimed = set()
+        self._created_dirs = set()
+    
+    def plan(self, source: Path) -> Optional[Path]:
+        """Return the output path for source, or None if it should be skipped"""
+        if self.layout == 'mirror':
+            target_dir = self.output_root / source.parent.relative_to(self.input_root)
+        else:
+            target_dir = self.output_root
+        
+        target = target_dir / f"{source.stem}{self.extension}"
+        key = str(target).casefold()
+        if key in self._claimed:
+            self.collision_count += 1
+            if self.on_collision == 'skip':
+                return None
+            if self.on_collision == 'suffix':
+                n = 1
+                while key in self._claimed:
+                    target = target_dir / f"{source.stem}_{n}{self.extension}"
+                    key = str(target).casefold()
+                    n += 1
+            elif self.on_collision == 'hash':
+                digest = hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:8]
+                target = target_dir / f"{source.stem}_{digest}{self.extension}"
+                key = str(target).casefold()
+        self._claimed.add(key)
+        
+        if self.create_dirs and target_dir not in self._created_dirs:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(target_dir)
+        return target
+
+
+def file_content_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Persistent record of previous conversions used for incremental batches.
+
+    The manifest lives in the output directory and stores, per source file,
+    its size, mtime, content hash, the conversion options used and the
+    output path. A source is considered up to date when its options match,
+    its output still exists and its content is unchanged (size + mtime, or
+    the content hash when only the mtime differs).
+    """
+    
+    FILENAME = '.photo_converter_manifest.json'
+    VERSION = 1
+    
+    # record() saves at least this often, so a killed run keeps its progress
+    SAVE_INTERVAL_SECONDS = 30.0
+    SAVE_INTERVAL_FILES = 1000
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self.unsaved = 0
+        self.last_saved = time.monotonic()
+    
+    @classmethod
+    def for_output_dir(cls, output_dir: Path) -> 'ConversionManifest':
+        """Load (or start) the manifest kept in an output directory"""
+        manifest = cls(output_dir / cls.FILENAME)
+        manifest.load()
+        return manifest
+    
+    @staticmethod
+    def _normalize_options(options: Dict[str, Any]) -> Dict[str, Any]:
+        # Round-trip through JSON so tuples and lists compare equal
+        return json.loads(json.dumps(options, sort_keys=True))
+    
+    def load(self):
+        """Read entries from disk, ignoring a missing or unreadable manifest"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('files', {})
+    
+    def save(self):
+        """Write entries to disk atomically (temp file + fsync + rename)"""
+        if not self.dirty:
+            return
+        with atomic_path(self.path) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'files': self.entries}, f, indent=1, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+        self.dirty = False
+        self.unsaved = 0
+        self.last_saved = time.monotonic()
+    
+    def is_up_to_date(self, source: Path, output: Path, options: Dict[str, Any],
+                      outputs: Optional[List[Path]] = None) -> bool:
+        """Check whether source was already converted to output with these options.
+
+        ``outputs`` lists the files that must still exist (default: ``[output]``),
+        e.g. every rendition written for a base output path.
+        """
+        entry = self.entries.get(str(source.resolve()))
+        if entry is None:
+            return False
+        if entry.get('output') != str(output.resolve()):
+            return False
+        if not all(path.exists() for path in (outputs or [output])):
+            return False
+        if entry.get('options') != self._normalize_options(options):
+            return False
+        
+        try:
+            stat = source.stat()
+        except OSError:
+            return False
+        if stat.st_size != entry.get('size'):
+            return False
+        if stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        
+        # Touched but possibly unchanged (e.g. re-synced uploads): compare contents
+        if file_content_hash(source) != entry.get('sha256'):
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self.dirty = True
+        return True
+    
+    def record(self, source: Path, output: Path, options: Dict[str, Any],
+               sha256: Optional[str] = None):
+        """Remember a successful conversion.
+
+        ``sha256`` is the hash of the converted bytes when the caller has it
+        (see ``convert_many(hash_sources=True)``); otherwise the source is
+        read again. Saves to disk every ``SAVE_INTERVAL_SECONDS`` or
+        ``SAVE_INTERVAL_FILES`` records.
+        """
+        stat = source.stat()
+        self.entries[str(source.resolve())] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256 or file_content_hash(source),
+            'options': self._normalize_options(options),
+            'output': str(output.resolve()),
+        }
+        self.dirty = True
+        self.unsaved += 1
+        if (self.unsaved >= self.SAVE_INTERVAL_FILES
+                or time.monotonic() - self.last_saved >= self.SAVE_INTERVAL_SECONDS):
+            self.save()
+
+
+class DefaultCommandGroup(click.Group):
+    """Click group that falls back to a default command.
+
+    Keeps ``photo-converter INPUT OUTPUT [OPTIONS]`` working while also
+    offering subcommands such as ``photo-converter bench``.
+    """
+    
+    def __init__(self, *args, default_command: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+    
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ('--help', '-h'):
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup, default_command='convert')
+def main():
+    """Convert images between different formats.
 
+    Without a subcommand, arguments are passed to ``convert``
+    (e.g. ``photo-converter input.heic output.jpg``).
+    """
 
-@click.command()
+
+@main.command('convert')
 @click.argument('input_path', type=click.Path(exists=True, path_type=Path))
 @click.argument('output_path', type=click.Path(path_type=Path), required=False)
 @click.option('--batch', is_flag=True, help='Process all images in the input directory')
 @click.option('--output', '-o', type=click.Path(path_type=Path), help='Output directory for batch processing')
 @click.option('--format', '-f', type=str, help='Target format for batch conversion (jpg, png, webp, etc.)')
 @click.option('--quality', '-q', type=int, help='Quality for lossy formats (1-100)')
-@click.option('--resize', type=str, help='Resize images (format: WIDTHxHEIGHT, e.g., 800x600)')
+@click.option('--target-size', type=str, help='Pick JPEG/WebP quality per image to fit this size, e.g. 200KB')
+@click.option('--target-ssim', type=float, help='Pick the lowest JPEG/WebP quality reaching this SSIM, e.g. 0.98')
+@click.option('--tune-cache', type=click.Path(dir_okay=False, path_type=Path),
+              help='SQLite file caching tuned qualities (batch default: in the output directory)')
+@click.option('--profile', 'encoder_profile', type=click.Choice(list(ENCODER_PROFILES)), default='balanced',
+              show_default=True, help='Encoder profile: fast (bulk ingest), balanced, smallest (publishing)')
+@click.option('--progressive/--no-progressive', default=None, help='Write progressive JPEGs (overrides the profile)')
+@click.option('--subsampling', type=click.Choice(JPEG_SUBSAMPLING), help='JPEG chroma subsampling (overrides the profile)')
+@click.option('--webp-method', type=click.IntRange(0, 6), help='WebP encoder effort, 0 (fast) to 6 (smallest)')
+@click.option('--webp-lossless', is_flag=True, default=None, help='Write lossless WebP')
+@click.option('--png-compress-level', type=click.IntRange(0, 9), help='PNG zlib level, 0 (none) to 9 (smallest)')
+@click.option('--tiff-compression', type=click.Choice(TIFF_COMPRESSIONS), help='TIFF compression codec')
+@click.option('--background', default='white', show_default=True,
+              help='Colour transparent images are flattened onto for JPEG output (name or #RRGGBB)')
+@click.option('--resize', type=str, help='Resize images (format: WIDTHxHEIGHT, e.g., 800x600; WIDTHx or xHEIGHT for one side)')
+@click.option('--resize-mode', type=click.Choice(RESIZE_MODES), default='exact', show_default=True,
+              help='How --resize is applied: exact size, fit inside, fill and crop, one side, or a pixel budget')
+@click.option('--resample', type=click.Choice(list(RESAMPLE_FILTERS)), default='lanczos', show_default=True,
+              help='Resampling filter used when resizing')
+@click.option('--rendition', 'rendition_specs', multiple=True,
+              help='Extra output from the same decode, NAME:FORMAT[:WIDTHxHEIGHT][:QUALITY] (repeatable)')
+@click.option('--renditions-file', type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='JSON/YAML preset file listing renditions')
+@click.option('--downscale', type=click.Choice(list(PhotoConverter.DOWNSCALE_MODES)), default='balanced',
+              show_default=True, help='Speed/fidelity trade-off for reduced decoding when resizing')
+@click.option('--lossless/--no-lossless', default=True, show_default=True,
+              help='Copy JPEG data without re-encoding when no pixel change is needed')
+@click.option('--recursive', '-r', is_flag=True, help='Include images in subdirectories (batch mode)')
+@click.option('--include', multiple=True, help='Only convert files matching this glob pattern (repeatable)')
+@click.option('--exclude', multiple=True, help='Skip files/directories matching this glob pattern (repeatable)')
+@click.option('--max-depth', type=int, help='Maximum subdirectory depth for --recursive (0 = top level only)')
+@click.option('--layout', type=click.Choice(OutputPlanner.LAYOUTS), default='flat', show_default=True,
+              help='Batch output layout: flat, or mirror the source directory tree')
+@click.option('--on-collision', type=click.Choice(OutputPlanner.COLLISION_POLICIES), default='suffix',
+              show_default=True, help='What to do when two sources map to the same output name')
+@click.option('--workers', '-w', type=int, help='Number of parallel worker processes for batch processing (default: CPU count)')
+@click.option('--prefetch', type=int, default=0, show_default=True,
+              help='Read this many upcoming source files ahead in the background (batch mode)')
+@click.option('--write-threads', type=int, default=0, show_default=True,
+              help='Write outputs on this many background threads (batch mode)')
+@click.option('--max-memory', type=str,
+              help='Memory budget for images being converted or prefetched at once, e.g. 2G (batch mode)')
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), envvar='PHOTO_CONVERTER_CACHE',
+              help='Shared output cache: reuse outputs of identical earlier conversions (env: PHOTO_CONVERTER_CACHE)')
+@click.option('--cache-link', is_flag=True, help='Hard-link cache hits instead of copying them')
+@click.option('--cache-max-size', type=str, help='Prune the cache to this size after a batch (e.g. 10G)')
+@click.option('--incremental', is_flag=True, help='Skip files unchanged since the last batch run (uses a manifest in the output directory)')
+@click.option('--dry-run', is_flag=True, help='Read headers only and print a plan (size, runtime, bad files) without converting')
+@click.option('--metrics', 'metrics_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Record per-stage timings and write a report (.json or .csv) after a batch')
+@click.option('--metrics-prom', type=click.Path(dir_okay=False, path_type=Path),
+              help='Also write the batch metrics as a Prometheus textfile')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
-def main(input_path: Path, output_path: Path, batch: bool, output: Path, 
-         format: str, quality: int, resize: str, verbose: bool):
-    """Convert images between different formats"""
+def convert(input_path: Path, output_path: Path, batch: bool, output: Path, 
+         format: str, quality: int, target_size: str, target_ssim: float, tune_cache: Path,
+         encoder_profile: str, progressive: Optional[bool], subsampling: str, webp_method: int,
+         webp_lossless: Optional[bool], png_compress_level: int, tiff_compression: str,
+         background: str, resize: str, resize_mode: str, resample: str, rendition_specs: Tuple[str, ...],
+         renditions_file: Path, downscale: str, lossless: bool, recursive: bool,
+         include: Tuple[str, ...], exclude: Tuple[str, ...], max_depth: int,
+         layout: str, on_collision: str, workers: int, prefetch: int, write_threads: int,
+         max_memory: str, cache_dir: Path, cache_link: bool, cache_max_size: str, incremental: bool,
+         dry_run: bool, metrics_path: Path, metrics_prom: Path, verbose: bool):
+    """Convert a single image, or a folder of images with --batch"""
     
     converter = PhotoConverter()
     
@@ -149,10 +1714,10 @@ def main(input_path: Path, output_path: Path, batch: bool, output: Path,
     resize_dims = None
     if resize:
         try:
-            width, height = map(int, resize.split('x'))
-            resize_dims = (width, height)
+            resize_dims = parse_resize(resize, resize_mode)
         except ValueError:
-            click.echo("Error: Invalid resize format. Use WIDTHxHEIGHT (e.g., 800x600)")
+            click.echo("Error: Invalid resize format. Use WIDTHxHEIGHT (e.g., 800x600), WIDTHx or xHEIGHT"
+                       " (a pixel count is also accepted with --resize-mode max-pixels)")
             return
     
     # Validate quality parameter
@@ -160,6 +1725,93 @@ def main(input_path: Path, output_path: Path, batch: bool, output: Path,
         click.echo("Error: Quality must be between 1 and 100")
         return
     
+    # Load renditions (one decode, several outputs)
+    renditions = []
+    try:
+        if renditions_file:
+            renditions.extend(load_renditions(renditions_file))
+        renditions.extend(Rendition.parse(spec) for spec in rendition_specs)
+    except (ValueError, KeyError, TypeError) as e:
+        click.echo(f"Error: Invalid rendition: {e}")
+        return
+    for rendition in renditions:
+        if rendition.extension not in converter.SUPPORTED_FORMATS:
+            click.echo(f"Error: Unsupported rendition format '{rendition.extension}'. Supported: {list(converter.SUPPORTED_FORMATS.keys())}")
+            return
+        # A rendition may take its size or its mode from --resize / --resize-mode
+        if rendition.resize or resize_dims:
+            try:
+                check_resize(rendition.resize or resize_dims, rendition.resize_mode or resize_mode)
+            except ValueError as e:
+                click.echo(f"Error: Invalid rendition '{rendition.name}': {e}")
+                return
+    if len({r.name for r in renditions}) != len(renditions):
+        click.echo("Error: Rendition names must be unique")
+        return
+    
+    # Parse quality targets
+    target_bytes = None
+    if target_size:
+        try:
+            target_bytes = parse_byte_size(target_size)
+        except ValueError:
+            click.echo("Error: Invalid target size. Use a size such as 200KB or 1.5M")
+            return
+    if target_ssim is not None and not (0 < target_ssim <= 1):
+        click.echo("Error: Target SSIM must be between 0 and 1")
+        return
+    
+    # Parse background colour (Pillow is only imported for non-default colours)
+    background_rgb = (255, 255, 255)
+    if background.lower() != 'white':
+        from PIL import ImageColor
+        try:
+            background_rgb = ImageColor.getrgb(background)[:3]
+        except ValueError:
+            click.echo("Error: Invalid background colour. Use a name such as white or #RRGGBB")
+            return
+    
+    # Collect explicit encoder overrides (None keeps the profile's value)
+    encoder_options = {
+        'progressive': progressive,
+        'subsampling': subsampling,
+        'webp_method': webp_method,
+        'webp_lossless': webp_lossless,
+        'png_compress_level': png_compress_level,
+        'tiff_compression': tiff_compression,
+    }
+    encoder_options = {name: value for name, value in encoder_options.items() if value is not None} or None
+    
+    # Validate workers parameter
+    if workers is not None and workers < 1:
+        click.echo("Error: Workers must be at least 1")
+        return
+    
+    if prefetch < 0 or write_threads < 0:
+        click.echo("Error: Prefetch and write threads cannot be negative")
+        return
+    
+    # Parse memory budget
+    max_memory_bytes = None
+    if max_memory:
+        try:
+            max_memory_bytes = parse_byte_size(max_memory)
+        except ValueError:
+            click.echo("Error: Invalid memory budget. Use a size such as 512M or 2G")
+            return
+    
+    # Parse cache size limit
+    cache_max_bytes = None
+    if cache_max_size:
+        if not cache_dir:
+            click.echo("Error: --cache-max-size requires --cache-dir")
+            return
+        try:
+            cache_max_bytes = parse_byte_size(cache_max_size)
+        except ValueError:
+            click.echo("Error: Invalid cache size. Use a size such as 512M or 10G")
+            return
+    
     if batch:
         # Batch processing
         if not input_path.is_dir():
@@ -169,42 +1821,175 @@ def main(input_path: Path, output_path: Path, batch: bool, output: Path,
         if not output:
             output = input_path / "converted"
         
-        if not format:
+        if renditions:
+            # Each rendition carries its own format; outputs are named <stem>_<rendition>
+            format = ''
+        elif not format:
             click.echo("Error: Format must be specified for batch processing")
             return
         
         # Ensure format has a dot prefix
-        if not format.startswith('.'):
+        if format and not format.startswith('.'):
             format = '.' + format
         
-        if format.lower() not in converter.SUPPORTED_FORMATS:
+        if format and format.lower() not in converter.SUPPORTED_FORMATS:
             click.echo(f"Error: Unsupported format '{format}'. Supported: {list(converter.SUPPORTED_FORMATS.keys())}")
             return
         
         # Create output directory
-        output.mkdir(parents=True, exist_ok=True)
-        
-        # Get all image files
-        image_files = converter.get_image_files(input_path)
+        if not dry_run:
+            output.mkdir(parents=True, exist_ok=True)
         
-        if not image_files:
+        # Stream image files from the scanner so conversion starts right away
+        image_files = converter.iter_image_files(input_path, recursive=recursive,
+                                                 include=list(include), exclude=list(exclude),
+                                                 max_depth=max_depth, skip_dirs=[output])
+        first_file = next(image_files, None)
+        if first_file is None:
             click.echo("No image files found in the input directory")
             return
+        image_files = itertools.chain([first_file], image_files)
+        
+        convert_kwargs = {'quality': quality, 'resize': resize_dims, 'downscale': downscale,
+                          'renditions': renditions or None, 'resize_mode': resize_mode,
+                          'resample': resample, 'lossless': lossless,
+                          'target_bytes': target_bytes, 'target_ssim': target_ssim,
+                          'encoder_profile': encoder_profile, 'encoder_options': encoder_options,
+                          'background': background_rgb}
+        
+        manifest = None
+        if incremental:
+            manifest = ConversionManifest.for_output_dir(output)
+            manifest_options = dict(convert_kwargs, format=format.lower())
+        
+        # Share tuned qualities between workers and across runs
+        if target_bytes or target_ssim:
+            convert_kwargs['tune_cache'] = str(tune_cache or output / '.photo_converter_tuning.sqlite')
+        
+        if cache_dir:
+            convert_kwargs['output_cache'] = str(cache_dir)
+            convert_kwargs['cache_link'] = cache_link
         
-        click.echo(f"Found {len(image_files)} image files to convert")
+        if workers is None:
+            workers = default_worker_count()
+        if verbose:
+            click.echo(f"Using {workers} worker process(es)")
+        
+        planner = OutputPlanner(output, format, input_root=input_path, layout=layout,
+                                on_collision=on_collision, create_dirs=not dry_run)
+        found_count = 0
+        skipped_count = 0
+        log = click.echo  # the progress bar's writer once it exists
+        
+        def planned_pairs():
+            # (input, output) pairs still to convert, as the scanner finds them
+            nonlocal found_count, skipped_count
+            for image_file in image_files:
+                found_count += 1
+                output_file = planner.plan(image_file)
+                if output_file is None:
+                    if verbose:
+                        log(f"Skipping (name collision): {image_file}")
+                    continue
+                outputs = [rendition_path(output_file, r) for r in renditions] or None
+                if manifest is not None and manifest.is_up_to_date(image_file, output_file, manifest_options, outputs):
+                    skipped_count += 1
+                    continue
+                yield image_file, output_file
+        
+        if dry_run:
+            from photo_converter_probe import plan_batch
+            plan = plan_batch(planned_pairs(), convert_kwargs, workers)
+            click.echo(f"Found {found_count} image files")
+            if skipped_count:
+                click.echo(f"Skipped {skipped_count} unchanged files")
+            _echo_plan(plan, verbose)
+            sys.exit(1 if plan.rejected else 0)
+        
+        def pending_pairs():
+            # Grows the progress bar total as the scanner discovers files
+            for pair in planned_pairs():
+                pbar.total = (pbar.total or 0) + 1
+                pbar.refresh()
+                yield pair
+        
+        report = None
+        if metrics_path or metrics_prom:
+            from photo_converter_metrics import MetricsReport
+            report = MetricsReport()
+            converter.collect_metrics = True
         
-        # Process files with progress bar
-        with tqdm(image_files, desc="Converting") as pbar:
-            for image_file in pbar:
-                output_file = output / f"{image_file.stem}{format.lower()}"
-                if verbose:
-                    pbar.write(f"Converting: {image_file} -> {output_file}")
-                converter.convert_image(image_file, output_file, quality, resize_dims)
+        # Process files with progress bar, updated as each worker finishes
+        from tqdm import tqdm
+        progress = BatchProgress()
         
-        click.echo(f"\nConversion complete!")
+        # First Ctrl+C/SIGTERM: start no new files and finish those in progress;
+        # a second one stops collecting results, though worker processes still
+        # finish their current files before exit (outputs are atomic either way)
+        control = BatchControl()
+        
+        def request_stop(signum, frame):
+            if control.cancelled:
+                raise KeyboardInterrupt
+            control.cancel()
+            log("Stopping: finishing files in progress (interrupt again to abort)")
+        
+        previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            with tqdm(total=0, desc="Converting") as pbar:
+                log = pbar.write
+                for result in converter.convert_many(pending_pairs(), workers=workers,
+                                                     max_memory=max_memory_bytes, prefetch=prefetch,
+                                                     write_threads=write_threads, control=control,
+                                                     hash_sources=manifest is not None, **convert_kwargs):
+                    progress.update(result)
+                    pbar.set_postfix_str(f"{progress.mb_per_sec:.1f} MB/s", refresh=False)
+                    if verbose:
+                        status = "Converted" if result.success else "Failed"
+                        pbar.write(f"{status}: {result.input_path} -> {result.output_path}")
+                    if manifest is not None and result.success:
+                        manifest.record(result.input_path, result.output_path, manifest_options,
+                                        result.source_sha256)
+                    if report is not None:
+                        report.add(result.input_path, result.output_path, result.success, result.metrics)
+                    pbar.update(1)
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            # Keep whatever was converted, even if the run is interrupted
+            if manifest is not None:
+                manifest.save()
+            if report is not None:
+                if metrics_path:
+                    report.write(metrics_path)
+                if metrics_prom:
+                    report.write_prometheus(metrics_prom)
+        
+        if cache_max_bytes is not None:
+            removed, freed = converter._output_cache(str(cache_dir)).prune(max_bytes=cache_max_bytes)
+            if verbose or removed:
+                click.echo(f"Cache pruned: {removed} objects, {freed / (1024 * 1024):.1f} MB freed")
+        
+        if control.cancelled:
+            click.echo(f"Cancelled after {progress.done} files")
+            if manifest is None:
+                click.echo("Re-run with --incremental to skip already converted files next time")
+        else:
+            click.echo(f"Found {found_count} image files")
+        if planner.collision_count:
+            click.echo(f"Output name collisions: {planner.collision_count} (policy: {on_collision})")
+        if skipped_count:
+            click.echo(f"Skipped {skipped_count} unchanged files")
+            if skipped_count == found_count and not control.cancelled:
+                click.echo("All files are up to date")
+                return
+        click.echo("\nConversion cancelled!" if control.cancelled else "\nConversion complete!")
         click.echo(f"Successfully converted: {converter.converted_count} files")
         if converter.failed_count > 0:
             click.echo(f"Failed conversions: {converter.failed_count} files")
+        if control.cancelled:
+            # Like a shell killed by Ctrl+C, so schedulers can tell a stopped run from a finished one
+            sys.exit(130)
     
     else:
         # Single file conversion
@@ -222,13 +2007,33 @@ def main(input_path: Path, output_path: Path, batch: bool, output: Path,
             click.echo(f"Error: Unsupported input format '{input_ext}'. Supported: {list(converter.SUPPORTED_FORMATS.keys())}")
             return
         
+        if renditions:
+            # OUTPUT_PATH names the base; renditions are written as <base>_<name>.<ext>
+            output_path = output_path.with_suffix('')
+        
+        if dry_run:
+            from photo_converter_probe import plan_batch
+            plan = plan_batch([(input_path, output_path)],
+                              {'quality': quality, 'resize': resize_dims, 'downscale': downscale,
+                               'renditions': renditions or None, 'resize_mode': resize_mode}, 1)
+            _echo_plan(plan, verbose=True)
+            sys.exit(1 if plan.rejected else 0)
+        
         # Create output directory if it doesn't exist
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         if verbose:
-            click.echo(f"Converting: {input_path} -> {output_path}")
+            targets = [rendition_path(output_path, r) for r in renditions] or [output_path]
+            click.echo(f"Converting: {input_path} -> {', '.join(str(t) for t in targets)}")
         
-        success = converter.convert_image(input_path, output_path, quality, resize_dims)
+        success = converter.convert_image(input_path, output_path, quality, resize_dims, downscale,
+                                          renditions=renditions or None, resize_mode=resize_mode,
+                                          resample=resample, lossless=lossless,
+                                          target_bytes=target_bytes, target_ssim=target_ssim,
+                                          tune_cache=str(tune_cache) if tune_cache else None,
+                                          encoder_profile=encoder_profile, encoder_options=encoder_options,
+                                          output_cache=str(cache_dir) if cache_dir else None,
+                                          cache_link=cache_link, background=background_rgb)
         
         if success:
             click.echo("Conversion successful!")
@@ -237,5 +2042,262 @@ def main(input_path: Path, output_path: Path, batch: bool, output: Path,
             sys.exit(1)
 
 
+
+def _parse_size_list(values: Tuple[str, ...]) -> List[Tuple[int, int]]:
+    return [parse_size(value) for value in values]
+
+
+@main.command('bench')
+@click.option('--size', 'sizes', multiple=True, default=('4032x3024',), show_default=True,
+              help='Synthetic source size WIDTHxHEIGHT (repeatable)')
+@click.option('--source-format', 'source_formats', multiple=True, default=('jpg', 'png'), show_default=True,
+              help='Source format (repeatable)')
+@click.option('--target-format', 'target_formats', multiple=True, default=('jpg', 'webp'), show_default=True,
+              help='Target format (repeatable)')
+@click.option('--resize', 'resizes', multiple=True, default=('none', '1600x1200'), show_default=True,
+              help="Resize box, or 'none' (repeatable)")
+@click.option('--resize-mode', type=click.Choice(RESIZE_MODES), default='fit', show_default=True,
+              help='Resize mode used for every resized case')
+@click.option('--quality', '-q', 'qualities', multiple=True, type=int, help='Quality (repeatable, default: library default)')
+@click.option('--workers', '-w', 'worker_counts', multiple=True, type=int,
+              help='Worker count (repeatable, default: 1 and CPU count)')
+@click.option('--profile', 'profiles', multiple=True, type=click.Choice(list(ENCODER_PROFILES)),
+              help='Encoder profile (repeatable, default: balanced)')
+@click.option('--downscale', type=click.Choice(list(PhotoConverter.DOWNSCALE_MODES)), default='balanced',
+              show_default=True, help='Speed/fidelity trade-off for reduced decoding when resizing')
+@click.option('--images', '-n', type=int, default=8, show_default=True, help='Images converted per case')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, path_type=Path),
+              help='Write the JSON report to this file instead of stdout')
+@click.option('--startup', is_flag=True, help='Measure import and --help start-up time instead of conversions')
+@click.option('--runs', type=int, default=5, show_default=True, help='Interpreter launches for --startup')
+@click.option('--max-startup-ms', type=float, help='With --startup, exit with status 1 if importing takes longer')
+def bench(sizes: Tuple[str, ...], source_formats: Tuple[str, ...], target_formats: Tuple[str, ...],
+          resizes: Tuple[str, ...], resize_mode: str, qualities: Tuple[int, ...],
+          worker_counts: Tuple[int, ...], profiles: Tuple[str, ...], downscale: str, images: int,
+          output: Path, startup: bool, runs: int, max_startup_ms: float):
+    """Benchmark decode/resize/encode throughput on synthetic images"""
+    from photo_converter_bench import measure_startup, run_benchmark
+    
+    if startup:
+        if runs < 1:
+            click.echo("Error: Runs must be at least 1")
+            return
+        report = measure_startup(runs)
+        text = json.dumps(report, indent=2)
+        if output:
+            output.write_text(text + "\n", encoding='utf-8')
+        else:
+            click.echo(text)
+        if max_startup_ms is not None and report['import_ms'] > max_startup_ms:
+            click.echo(f"Import took {report['import_ms']} ms, over the {max_startup_ms} ms budget", err=True)
+            sys.exit(1)
+        return
+    
+    converter = PhotoConverter()
+    try:
+        size_list = _parse_size_list(sizes)
+        resize_list = [None if value.lower() == 'none' else parse_resize(value, resize_mode)
+                       for value in resizes]
+    except ValueError as e:
+        click.echo(f"Error: Invalid size: {e}")
+        return
+    
+    formats = []
+    for fmt in source_formats + target_formats:
+        ext = fmt.lower() if fmt.startswith('.') else '.' + fmt.lower()
+        if ext not in converter.SUPPORTED_FORMATS:
+            click.echo(f"Error: Unsupported format '{fmt}'. Supported: {list(converter.SUPPORTED_FORMATS.keys())}")
+            return
+        formats.append(ext)
+    source_list = formats[:len(source_formats)]
+    target_list = formats[len(source_formats):]
+    
+    if any(not (1 <= q <= 100) for q in qualities):
+        click.echo("Error: Quality must be between 1 and 100")
+        return
+    if images < 1 or any(w < 1 for w in worker_counts):
+        click.echo("Error: Images and workers must be at least 1")
+        return
+    worker_list = list(worker_counts) or sorted({1, default_worker_count()})
+    
+    def progress(case):
+        click.echo(f"{case['size']} {case['source_format']} -> {case['target_format']} "
+                   f"resize={case['resize']} q={case['quality']} profile={case['profile']} "
+                   f"workers={case['workers']}: "
+                   f"{case['images_per_sec']} img/s", err=True)
+    
+    report = run_benchmark(size_list, source_list, target_list, resize_list, resize_mode=resize_mode,
+                           qualities=list(qualities) or [None], workers=worker_list,
+                           profiles=list(profiles) or ['balanced'],
+                           images=images, downscale=downscale, progress=progress)
+    
+    text = json.dumps(report, indent=2)
+    if output:
+        output.write_text(text + "\n", encoding='utf-8')
+        click.echo(f"Benchmark report written to {output}", err=True)
+    else:
+        click.echo(text)
+
+
+def _echo_plan(plan, verbose: bool = False):
+    """Print a BatchPlan, with one line per file when verbose"""
+    if verbose:
+        for row in plan.files:
+            details = [row['format'], f"{row['width']}x{row['height']}", row['mode']]
+            if row['orientation'] != 1:
+                details.append(f"orientation {row['orientation']}")
+            if row['frames'] > 1:
+                details.append(f"{row['frames']} frames")
+            click.echo(f"{row['input']}: {' '.join(details)} -> {row['output_megapixels']:.1f} MP, "
+                       f"~{row['estimated_bytes'] * plan.size_ratio / 1024:.0f} KB, "
+                       f"~{row['estimated_seconds'] * plan.time_ratio:.2f}s")
+    for line in plan.describe():
+        click.echo(line)
+
+
+@main.command('probe')
+@click.argument('input_path', type=click.Path(exists=True, path_type=Path))
+@click.option('--format', '-f', default='jpg', show_default=True, help='Target format to estimate for')
+@click.option('--quality', '-q', type=int, help='Quality for lossy formats (1-100)')
+@click.option('--resize', type=str, help='Resize box, as for convert (WIDTHxHEIGHT, WIDTHx or xHEIGHT)')
+@click.option('--resize-mode', type=click.Choice(RESIZE_MODES), default='exact', show_default=True,
+              help='How --resize is applied')
+@click.option('--downscale', type=click.Choice(list(PhotoConverter.DOWNSCALE_MODES)), default='balanced',
+              show_default=True, help='Reduced-decoding trade-off when resizing')
+@click.option('--profile', 'encoder_profile', type=click.Choice(list(ENCODER_PROFILES)), default='balanced',
+              show_default=True, help='Encoder profile (used by --calibrate)')
+@click.option('--recursive', '-r', is_flag=True, help='Include images in subdirectories')
+@click.option('--include', multiple=True, help='Only probe files matching this glob pattern (repeatable)')
+@click.option('--exclude', multiple=True, help='Skip files/directories matching this glob pattern (repeatable)')
+@click.option('--max-depth', type=int, help='Maximum subdirectory depth for --recursive')
+@click.option('--workers', '-w', type=int, help='Worker processes the runtime is estimated for (default: CPU count)')
+@click.option('--calibrate', type=int, default=0, show_default=True,
+              help='Convert this many sample files to measure real costs on this machine')
+@click.option('--json', 'as_json', is_flag=True, help='Print the plan as JSON')
+@click.option('--verbose', '-v', is_flag=True, help='Show every file')
+def probe(input_path: Path, format: str, quality: int, resize: str, resize_mode: str, downscale: str,
+          encoder_profile: str, recursive: bool, include: Tuple[str, ...], exclude: Tuple[str, ...],
+          max_depth: int, workers: int, calibrate: int, as_json: bool, verbose: bool):
+    """Inspect images from their headers only and estimate what converting them costs.
+    
+    Exits with status 1 when any file is rejected (corrupt, empty or a
+    decompression bomb), so it can gate a batch job.
+    """
+    converter = PhotoConverter()
+    extension = format.lower() if format.startswith('.') else '.' + format.lower()
+    if extension not in converter.SUPPORTED_FORMATS:
+        click.echo(f"Error: Unsupported format '{format}'. Supported: {list(converter.SUPPORTED_FORMATS.keys())}")
+        return
+    if quality and not (1 <= quality <= 100):
+        click.echo("Error: Quality must be between 1 and 100")
+        return
+    resize_dims = None
+    if resize:
+        try:
+            resize_dims = parse_resize(resize, resize_mode)
+        except ValueError:
+            click.echo("Error: Invalid resize format. Use WIDTHxHEIGHT (e.g., 800x600), WIDTHx or xHEIGHT")
+            return
+    if workers is not None and workers < 1:
+        click.echo("Error: Workers must be at least 1")
+        return
+    
+    if input_path.is_dir():
+        sources = converter.iter_image_files(input_path, recursive=recursive, include=list(include),
+                                             exclude=list(exclude), max_depth=max_depth)
+    else:
+        sources = [input_path]
+    
+    from photo_converter_probe import plan_batch
+    convert_kwargs = {'quality': quality, 'resize': resize_dims, 'resize_mode': resize_mode,
+                      'downscale': downscale, 'encoder_profile': encoder_profile}
+    # Only the output suffix matters for the estimates; nothing is written
+    plan = plan_batch(((source, source.with_suffix(extension)) for source in sources),
+                      convert_kwargs, workers or default_worker_count())
+    if calibrate:
+        plan.calibrate(calibrate)
+    
+    if as_json:
+        click.echo(json.dumps(plan.to_dict(), indent=2))
+    else:
+        _echo_plan(plan, verbose)
+    if plan.rejected:
+        sys.exit(1)
+
+
+@main.command('serve')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on for HTTP')
+@click.option('--port', type=int, default=8765, show_default=True, help='HTTP port (0 picks a free port)')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Listen on this Unix socket instead of HTTP')
+@click.option('--workers', '-w', type=int, help='Warm worker processes (default: CPU count)')
+@click.option('--max-upload', type=str, default='100M', show_default=True, help='Largest accepted upload')
+@click.option('--verbose', '-v', is_flag=True, help='Log every request')
+def serve(host: str, port: int, socket_path: Path, workers: int, max_upload: str, verbose: bool):
+    """Run a conversion service: POST image bytes to /convert?format=webp&..."""
+    from photo_converter_server import serve as run_server
+    
+    if workers is not None and workers < 1:
+        click.echo("Error: Workers must be at least 1")
+        return
+    try:
+        max_upload_bytes = parse_byte_size(max_upload)
+    except ValueError:
+        click.echo("Error: Invalid upload limit. Use a size such as 50M")
+        return
+    
+    def ready(address):
+        click.echo(f"Listening on {address} ({workers or default_worker_count()} workers)", err=True)
+    
+    run_server(host, port, socket_path, workers, max_upload_bytes, verbose, ready)
+
+
+@main.group('cache')
+def cache():
+    """Inspect or prune the shared output cache"""
+
+
+@cache.command('stats')
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), envvar='PHOTO_CONVERTER_CACHE',
+              required=True, help='Cache directory (env: PHOTO_CONVERTER_CACHE)')
+@click.option('--json', 'as_json', is_flag=True, help='Print the statistics as JSON')
+def cache_stats(cache_dir: Path, as_json: bool):
+    """Show the number and size of cached outputs"""
+    from photo_converter_cache import OutputCache
+    stats = OutputCache(cache_dir).stats()
+    if as_json:
+        click.echo(json.dumps(stats, indent=2))
+        return
+    click.echo(f"Cache: {stats['path']}")
+    click.echo(f"Entries: {stats['entries']} ({stats['objects']} files)")
+    click.echo(f"Size: {stats['bytes'] / (1024 * 1024):.1f} MB")
+    if stats['oldest_use'] is not None:
+        click.echo(f"Last used: {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_use']))}"
+                   f" .. {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest_use']))}")
+
+
+@cache.command('prune')
+@click.option('--cache-dir', type=click.Path(file_okay=False, path_type=Path), envvar='PHOTO_CONVERTER_CACHE',
+              required=True, help='Cache directory (env: PHOTO_CONVERTER_CACHE)')
+@click.option('--max-size', type=str, help='Evict least recently used outputs until the cache fits (e.g. 10G)')
+@click.option('--max-age', type=float, help='Evict outputs unused for this many days')
+def cache_prune(cache_dir: Path, max_size: str, max_age: float):
+    """Evict cached outputs by size (least recently used first) and age"""
+    from photo_converter_cache import OutputCache
+    if max_size is None and max_age is None:
+        click.echo("Error: Give --max-size and/or --max-age")
+        return
+    max_bytes = None
+    if max_size:
+        try:
+            max_bytes = parse_byte_size(max_size)
+        except ValueError:
+            click.echo("Error: Invalid cache size. Use a size such as 512M or 10G")
+            return
+    removed, freed = OutputCache(cache_dir).prune(max_bytes=max_bytes,
+                                                  max_age=max_age * 86400 if max_age is not None else None)
+    click.echo(f"Removed {removed} cached files, freed {freed / (1024 * 1024):.1f} MB")
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
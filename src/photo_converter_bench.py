@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Benchmarks - Measure decode/resize/encode throughput
+"""
+
+import itertools
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import PIL
+from PIL import Image
+
+# Add the src directory to the path so we can import photo_converter
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from photo_converter import PhotoConverter, default_worker_count
+
+# Optional modules that should stay unimported until a conversion needs them
+LAZY_MODULES = ('PIL', 'tqdm', 'yaml', 'pillow_heif', 'pyheif', 'concurrent.futures')
+
+try:
+    import resource
+    RSS_SUPPORTED = True
+except ImportError:
+    # Not available on Windows
+    RSS_SUPPORTED = False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its (finished) children, in MB"""
+    if not RSS_SUPPORTED:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(max(own, children) / scale, 1)
+
+
+def synthesize_image(path: Path, size: Tuple[int, int]):
+    """Write a photo-like test image (gradients plus noise) of the given size"""
+    # Smooth areas plus noise give encoders roughly photographic work to do
+    red = Image.linear_gradient('L').resize(size)
+    green = Image.radial_gradient('L').resize(size)
+    blue = Image.effect_noise(size, 48)
+    img = Image.merge('RGB', (red, green, blue))
+    save_kwargs = {'quality': 90} if path.suffix.lower() in ('.jpg', '.jpeg', '.webp') else {}
+    img.save(path, **save_kwargs)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_case(sources: List[Path], output_dir: Path, target_format: str, workers: int,
+             convert_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert every source once and collect timing statistics"""
+    converter = PhotoConverter()
+    pairs = [(src, output_dir / f"{i}{target_format}") for i, src in enumerate(sources)]
+    bytes_in = sum(src.stat().st_size for src in sources)
+    latencies = []
+    
+    start = time.perf_counter()
+    if workers == 1:
+        # In-process, so every file's latency can be measured
+        for input_path, output_path in pairs:
+            file_start = time.perf_counter()
+            converter.convert_image(input_path, output_path, **convert_kwargs)
+            latencies.append(time.perf_counter() - file_start)
+    else:
+        for _ in converter.convert_many(pairs, workers=workers, **convert_kwargs):
+            pass
+    elapsed = time.perf_counter() - start
+    
+    bytes_out = sum(dst.stat().st_size for _, dst in pairs if dst.exists())
+    result = {
+        'images': len(pairs),
+        'converted': converter.converted_count,
+        'failed': converter.failed_count,
+        'seconds': round(elapsed, 4),
+        'images_per_sec': round(len(pairs) / elapsed, 2) if elapsed else None,
+        'mb_per_sec': round(bytes_in / (1024 * 1024) / elapsed, 2) if elapsed else None,
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    return result
+
+
+def run_case_isolated(sources: List[Path], output_dir: Path, target_format: str, workers: int,
+                      convert_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """run_case in a fresh interpreter, so peak_rss_mb covers this case only
+    (ru_maxrss never goes down within a process)"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, sources, output_dir, target_format, workers,
+                               convert_kwargs).result()
+
+
+def run_benchmark(sizes: List[Tuple[int, int]], source_formats: List[str], target_formats: List[str],
+                  resizes: List[Optional[Tuple[int, int]]], resize_mode: str = 'exact',
+                  qualities: List[Optional[int]] = (None,), workers: List[int] = (1,),
+                  profiles: List[str] = ('balanced',), images: int = 8, downscale: str = 'balanced',
+                  work_dir: Optional[Path] = None, progress=None) -> Dict[str, Any]:
+    """Run every combination of the given parameters and return a JSON-able report.
+    
+    Source images are synthesised once per (size, format) and hard-linked
+    (or copied) ``images`` times so each case converts distinct files.
+    Each case runs in its own process, so peak RSS is reported per case.
+    ``progress`` is an optional callable receiving each finished case.
+    """
+    with tempfile.TemporaryDirectory(prefix='photo-converter-bench-', dir=work_dir) as tmp:
+        tmp_path = Path(tmp)
+        
+        # Synthesise the inputs once
+        inputs = {}
+        for size, source_format in itertools.product(sizes, source_formats):
+            case_dir = tmp_path / f"in_{size[0]}x{size[1]}_{source_format[1:]}"
+            case_dir.mkdir()
+            original = case_dir / f"source{source_format}"
+            synthesize_image(original, size)
+            sources = []
+            for i in range(images):
+                copy = case_dir / f"{i}{source_format}"
+                try:
+                    os.link(original, copy)
+                except OSError:
+                    copy.write_bytes(original.read_bytes())
+                sources.append(copy)
+            inputs[(size, source_format)] = sources
+        
+        cases = []
+        combinations = itertools.product(sizes, source_formats, target_formats, resizes, qualities,
+                                         profiles, workers)
+        for index, (size, source_format, target_format, resize, quality, profile,
+                    worker_count) in enumerate(combinations):
+            output_dir = tmp_path / f"out_{index}"
+            output_dir.mkdir()
+            # lossless=False: a plain JPEG -> JPEG case would otherwise measure a byte copy
+            convert_kwargs = {'quality': quality, 'resize': resize, 'resize_mode': resize_mode,
+                              'downscale': downscale, 'encoder_profile': profile, 'lossless': False}
+            case = {
+                'size': f"{size[0]}x{size[1]}",
+                'source_format': source_format,
+                'target_format': target_format,
+                'resize': f"{resize[0] or ''}x{resize[1] or ''}" if resize else None,
+                'resize_mode': resize_mode if resize else None,
+                'quality': quality,
+                'profile': profile,
+                'workers': worker_count,
+            }
+            case.update(run_case_isolated(inputs[(size, source_format)], output_dir, target_format,
+                                 worker_count, convert_kwargs))
+            cases.append(case)
+            if progress:
+                progress(case)
+    
+    environment = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pillow': PIL.__version__,
+        'cpu_count': default_worker_count(),
+    }
+    try:
+        import pillow_heif
+        environment['pillow_heif'] = pillow_heif.__version__
+    except ImportError:
+        pass
+    return {'environment': environment, 'cases': cases}
+
+
+def parse_importtime(stderr: str, module: str) -> Tuple[Optional[float], List[Dict[str, Any]]]:
+    """Cumulative import time of ``module`` and its direct imports, in ms,
+    from ``python -X importtime`` output"""
+    entries = []
+    for line in stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <two spaces per level><name>"
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(fields[1])))
+    
+    # Children are listed before their parent
+    total = None
+    children = []
+    for index, (depth, name, cumulative) in enumerate(entries):
+        if depth == 0 and name == module:
+            total = cumulative / 1000
+            for child_depth, child_name, child_cumulative in reversed(entries[:index]):
+                if child_depth == 0:
+                    break
+                if child_depth == 1:
+                    children.append({'module': child_name, 'ms': round(child_cumulative / 1000, 2)})
+            break
+    children.sort(key=lambda child: -child['ms'])
+    return total, children
+
+
+def measure_startup(runs: int = 5) -> Dict[str, Any]:
+    """Measure how long importing photo_converter and running --help take.
+    
+    Each run is a fresh interpreter. Reports medians, the heaviest direct
+    imports and any optional codec/UI module that got imported eagerly.
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src_dir, os.environ.get('PYTHONPATH')])))
+    probe = ('import sys, photo_converter; '
+             f'print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))')
+    
+    import_ms = []
+    help_ms = []
+    children = []
+    eager = ''
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], env=env,
+                                capture_output=True, text=True, check=True)
+        total, children = parse_importtime(result.stderr, 'photo_converter')
+        import_ms.append(total)
+        eager = result.stdout.strip()
+        
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(src_dir, 'photo_converter.py'), '--help'],
+                       env=env, capture_output=True, check=True)
+        help_ms.append((time.perf_counter() - start) * 1000)
+    
+    return {
+        'runs': runs,
+        'import_ms': round(statistics.median(import_ms), 2),
+        'help_ms': round(statistics.median(help_ms), 2),
+        'heaviest_imports': children[:10],
+        'eager_modules': eager.split(',') if eager else [],
+        'python': platform.python_version(),
+    }
+
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Cache - Content-addressed store of converted outputs
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import PIL
+
+
+def _read_umask() -> int:
+    """The process umask (it can only be read by setting it)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: os.umask briefly changes a process-wide setting
+_UMASK = _read_umask()
+
+
+def sharded_entries(root: Path) -> List[Tuple[Path, os.stat_result]]:
+    """Files of a ``<root>/<xx>/<name>`` store with their stats, skipping
+    ``.tmp-`` files still being written"""
+    entries = []
+    if not root.is_dir():
+        return entries
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.startswith('.tmp-') or not entry.is_file():
+                continue
+            try:
+                entries.append((Path(entry.path), entry.stat()))
+            except OSError:
+                continue
+    return entries
+
+
+def evict_lru(entries: List[Tuple[Path, os.stat_result]], max_bytes: Optional[int] = None,
+              max_age: Optional[float] = None) -> Tuple[int, int]:
+    """Delete files unused (by mtime) for ``max_age`` seconds, then least
+    recently used ones until the rest fit in ``max_bytes``.
+    
+    Returns (files removed, bytes freed).
+    """
+    entries = sorted(entries, key=lambda e: e[1].st_mtime)
+    total = sum(stat.st_size for _, stat in entries)
+    cutoff = time.time() - max_age if max_age is not None else None
+    removed = freed = 0
+    for path, stat in entries:
+        too_old = cutoff is not None and stat.st_mtime < cutoff
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            # Oldest first: everything after this is newer and fits
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= stat.st_size
+        removed += 1
+        freed += stat.st_size
+    return removed, freed
+
+
+class OutputCache:
+    """Converted outputs keyed by source content, options and library versions.
+    
+    Objects live under ``<root>/objects/<xx>/<key>-<n>``, one per output of
+    a conversion (``n`` is the output's index, so rendition sets are cached
+    together). Objects are written with a temp file + rename, so several
+    processes or machines can share one cache directory. A hit refreshes
+    the object's mtime, which ``prune`` uses for least-recently-used
+    eviction.
+    
+    With ``link`` set, hits are hard-linked into place instead of copied.
+    Linked outputs share their inode with the cache, so they must not be
+    modified in place.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, root: Path, link: bool = False):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.link = link
+    
+    def key(self, source_data: bytes, options: Dict[str, Any]) -> str:
+        """Cache key for a source's bytes and the options that shape its outputs"""
+        versions = {'cache': self.VERSION, 'pillow': PIL.__version__}
+        try:
+            import pillow_heif
+            versions['pillow_heif'] = pillow_heif.__version__
+        except ImportError:
+            pass
+        digest = hashlib.sha256(source_data)
+        digest.update(json.dumps({'options': options, 'versions': versions},
+                                 sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _object_path(self, key: str, index: int) -> Path:
+        return self.objects / key[:2] / f"{key}-{index}"
+    
+    def fetch(self, key: str, count: int) -> Optional[List[Path]]:
+        """Cached objects for all ``count`` outputs of a key, or None on a miss"""
+        paths = [self._object_path(key, index) for index in range(count)]
+        for path in paths:
+            try:
+                # Current time needs only write access, not ownership
+                os.utime(path)
+            except PermissionError:
+                # Another user's object in a shared cache: still usable if readable
+                if not os.access(path, os.R_OK):
+                    return None
+            except OSError:
+                return None
+        return paths
+    
+    def store(self, key: str, index: int, data: bytes):
+        """Add one output to the cache (atomically; an existing object wins)"""
+        path = self._object_path(key, index)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix='.tmp-', dir=path.parent)
+        try:
+            # mkstemp creates 0600 files; objects (and outputs linked to them)
+            # should get the same permissions as any other written file
+            os.fchmod(fd, 0o666 & ~_UMASK)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+    
+    def place(self, cached: Path, output: Path):
+        """Put a cached object at ``output`` by hard link or copy (atomically)"""
+        tmp_path = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+        if self.link:
+            try:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                os.link(cached, tmp_path)
+                os.replace(tmp_path, output)
+                return
+            except OSError:
+                # Different filesystem or no hard-link support: copy instead
+                pass
+        try:
+            shutil.copyfile(cached, tmp_path)
+            os.replace(tmp_path, output)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    
+    def stats(self) -> Dict[str, Any]:
+        """Object count, total size and last-use range of the cache"""
+        entries = sharded_entries(self.objects)
+        keys = {path.name.rsplit('-', 1)[0] for path, _ in entries}
+        mtimes = [stat.st_mtime for _, stat in entries]
+        return {
+            'path': str(self.root),
+            'entries': len(keys),
+            'objects': len(entries),
+            'bytes': sum(stat.st_size for _, stat in entries),
+            'oldest_use': min(mtimes) if mtimes else None,
+            'newest_use': max(mtimes) if mtimes else None,
+        }
+    
+    def prune(self, max_bytes: Optional[int] = None,
+              max_age: Optional[float] = None) -> Tuple[int, int]:
+        """Evict objects unused for ``max_age`` seconds, then least recently
+        used ones until the cache fits in ``max_bytes``.
+        
+        Returns (objects removed, bytes freed).
+        """
+        return evict_lru(sharded_entries(self.objects), max_bytes, max_age)
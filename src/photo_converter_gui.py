@@ -6,20 +6,294 @@ Photo Converter GUI - A graphical interface for the photo converter tool
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import queue
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import sys
 import os
 
 # Add the src directory to the path so we can import photo_converter
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from photo_converter import PhotoConverter
+from photo_converter import (RESIZE_MODES, BatchControl, BatchProgress, OutputPlanner, PhotoConverter,
+                             default_worker_count)
+from photo_converter_thumbs import ThumbnailCache, png_to_photo_data
+
+
+class FolderScan:
+    """Cancellable background scan of one folder for convertible images.
+    
+    A single ``os.scandir`` pass collects the supported image files and
+    counts them per type, along with HEIC/HEIF files and all files.
+    ``on_update(scan, summary, finished)`` is called from the scan thread
+    every ``UPDATE_EVERY`` entries and once more when the scan completes
+    (not when it is cancelled).
+    """
+    
+    UPDATE_EVERY = 500
+    
+    def __init__(self, folder: Path, supported_formats: Dict[str, str],
+                 on_update: Callable[['FolderScan', Dict[str, Any], bool], None]):
+        self.folder = folder
+        self.supported = {ext.lower() for ext in supported_formats}
+        self.on_update = on_update
+        self.image_files: List[Path] = []
+        self.file_types: Dict[str, int] = {}
+        self.heic_count = 0
+        self.total_files = 0
+        self.error: Optional[str] = None
+        self.folder_mtime: Optional[int] = None
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self) -> 'FolderScan':
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the scan ends (finished or cancelled)"""
+        return self._finished.wait(timeout)
+    
+    def is_current(self) -> bool:
+        """True when the scan completed and the folder has not changed since"""
+        if not self.finished or self.cancelled or self.error:
+            return False
+        try:
+            return os.stat(self.folder).st_mtime_ns == self.folder_mtime
+        except OSError:
+            return False
+    
+    @staticmethod
+    def describe_types(file_types: Dict[str, int], limit: Optional[int] = None) -> str:
+        """'120 JPG, 4 PNG' style breakdown, most common types first"""
+        ordered = sorted(file_types.items(), key=lambda item: (-item[1], item[0]))
+        parts = [f"{count} {ext[1:].upper()}" for ext, count in ordered[:limit]]
+        if limit is not None and len(ordered) > limit:
+            parts.append("...")
+        return ", ".join(parts)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'images': len(self.image_files),
+            'file_types': dict(self.file_types),
+            'heic': self.heic_count,
+            'files': self.total_files,
+            'error': self.error,
+        }
+    
+    def _run(self):
+        try:
+            self.folder_mtime = os.stat(self.folder).st_mtime_ns
+            with os.scandir(self.folder) as entries:
+                for count, entry in enumerate(entries, 1):
+                    if self.cancelled:
+                        return
+                    if count % self.UPDATE_EVERY == 0:
+                        self.on_update(self, self.summary(), False)
+                    try:
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    self.total_files += 1
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in ('.heic', '.heif'):
+                        self.heic_count += 1
+                    if ext in self.supported:
+                        self.image_files.append(Path(entry.path))
+                        self.file_types[ext] = self.file_types.get(ext, 0) + 1
+            self.image_files.sort()
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self._finished.set()
+        self.on_update(self, self.summary(), True)
+
+
+class ThumbnailGrid(ttk.Frame):
+    """Scrollable grid of thumbnails that only materialises the visible rows.
+    
+    Canvas items and PhotoImages exist for the rows on screen (plus one row
+    either side); scrolling drops the rest. Missing thumbnails are made on
+    a small thread pool; jobs whose cell scrolled away before they started
+    are skipped, so fast scrolling through tens of thousands of files only
+    decodes what is actually looked at. Results reach Tk through
+    ``call_in_main_thread``.
+    """
+    
+    PADDING = 8
+    CAPTION_HEIGHT = 16
+    
+    def __init__(self, parent, thumbnails: ThumbnailCache, call_in_main_thread, workers: int = 4):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.call_in_main_thread = call_in_main_thread
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnail')
+        self.cell_width = thumbnails.size + self.PADDING * 2
+        self.cell_height = thumbnails.size + self.CAPTION_HEIGHT + self.PADDING * 2
+        
+        self.files: List[Path] = []
+        self.columns = 0
+        self.generation = 0  # bumped by set_files so stale results are ignored
+        self.cells: Dict[int, List[int]] = {}  # index -> canvas item ids
+        self.images: Dict[int, tk.PhotoImage] = {}  # keeps visible PhotoImages alive
+        self.wanted = set()  # indexes on screen, read by the pool threads
+        self.requested = set()  # indexes with a thumbnail job queued or running
+        
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._scroll)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.status = self.canvas.create_text(self.PADDING, self.PADDING, anchor=tk.NW,
+                                              text="Select files or a folder to preview them")
+        
+        self.canvas.bind('<Configure>', lambda event: self.refresh())
+        # Windows/macOS wheel events, then X11 buttons 4/5
+        self.canvas.bind('<MouseWheel>', lambda event: self._scroll('scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda event: self._scroll('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda event: self._scroll('scroll', 1, 'units'))
+    
+    def set_files(self, files: List[Path]):
+        """Show a new list of files (main thread)"""
+        self.generation += 1
+        self.files = list(files)
+        self._clear_cells()
+        self.requested.clear()
+        self.canvas.yview_moveto(0)
+        self.canvas.itemconfigure(self.status, text="" if self.files else "No images to preview")
+        self.refresh()
+    
+    def close(self):
+        # Queued jobs see a new generation and return without decoding
+        self.generation += 1
+        self.executor.shutdown(wait=False)
+    
+    def _scroll(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+    
+    def _columns(self) -> int:
+        return max(1, self.canvas.winfo_width() // self.cell_width)
+    
+    def _clear_cells(self):
+        for items in self.cells.values():
+            self.canvas.delete(*items)
+        self.cells.clear()
+        self.images.clear()
+        self.wanted = set()
+    
+    def refresh(self):
+        """Draw the cells on screen, drop the others and queue missing thumbnails"""
+        if not self.winfo_ismapped():
+            # Hidden tab: nothing to draw until it is shown
+            return
+        columns = self._columns()
+        rows = (len(self.files) + columns - 1) // columns
+        self.canvas.configure(scrollregion=(0, 0, columns * self.cell_width, max(rows * self.cell_height, 1)))
+        self.canvas.configure(yscrollincrement=self.cell_height // 4)
+        if columns != self.columns:
+            # The window was resized to a different column count: every cell moves
+            self._clear_cells()
+            self.columns = columns
+        
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(0, int(top // self.cell_height) - 1)
+        last_row = min(rows, int(bottom // self.cell_height) + 2)
+        visible = set(range(first_row * columns, min(last_row * columns, len(self.files))))
+        
+        for index in list(self.cells):
+            if index not in visible:
+                self.canvas.delete(*self.cells.pop(index))
+                self.images.pop(index, None)
+        # Set before queueing, so the pool sees the new cells as wanted
+        self.wanted = visible
+        for index in sorted(visible - set(self.cells)):
+            self._draw_cell(index)
+    
+    def _draw_cell(self, index: int):
+        path = self.files[index]
+        size = self.thumbnails.size
+        x = (index % self.columns) * self.cell_width + self.PADDING
+        y = (index // self.columns) * self.cell_height + self.PADDING
+        frame = self.canvas.create_rectangle(x, y, x + size, y + size, outline='#cccccc')
+        name = path.name if len(path.name) <= 20 else path.name[:17] + '...'
+        caption = self.canvas.create_text(x + size // 2, y + size + 2, anchor=tk.N, text=name)
+        self.cells[index] = [frame, caption]
+        
+        key = self.thumbnails.key(path)
+        data = self.thumbnails.peek(key) if key else None
+        if data is not None:
+            self._show(index, data)
+        elif index not in self.requested:
+            self.requested.add(index)
+            self.executor.submit(self._load, self.generation, index, path)
+    
+    def _load(self, generation: int, index: int, path: Path):
+        """Pool thread: make or fetch one thumbnail unless its cell scrolled away"""
+        if generation != self.generation or index not in self.wanted:
+            self.call_in_main_thread(lambda: self._loaded(generation, index, None, skipped=True))
+            return
+        data = self.thumbnails.get(path)
+        self.call_in_main_thread(lambda: self._loaded(generation, index, data, skipped=False))
+    
+    def _loaded(self, generation: int, index: int, data: Optional[bytes], skipped: bool):
+        if generation != self.generation:
+            return
+        self.requested.discard(index)
+        if index not in self.cells:
+            return
+        if data is not None:
+            self._show(index, data)
+        elif skipped:
+            # Skipped while off screen, but visible again: queue it once more
+            self.requested.add(index)
+            self.executor.submit(self._load, generation, index, self.files[index])
+        else:
+            x, y = self._cell_centre(index)
+            self.cells[index].append(self.canvas.create_text(x, y, text="No preview", fill='#888888'))
+    
+    def _cell_centre(self, index: int) -> Tuple[int, int]:
+        size = self.thumbnails.size
+        return ((index % self.columns) * self.cell_width + self.PADDING + size // 2,
+                (index // self.columns) * self.cell_height + self.PADDING + size // 2)
+    
+    def _show(self, index: int, data: bytes):
+        if index in self.images:
+            return
+        image = tk.PhotoImage(data=png_to_photo_data(data))
+        self.images[index] = image
+        x, y = self._cell_centre(index)
+        self.cells[index].append(self.canvas.create_image(x, y, image=image))
 
 
 class PhotoConverterGUI:
     """GUI application for photo conversion"""
     
+    # Worker threads never touch Tk: they post events to a queue that the
+    # main loop drains in batches every DRAIN_INTERVAL_MS
+    DRAIN_INTERVAL_MS = 50
+    MAX_EVENTS_PER_DRAIN = 5000
+    # The log view keeps only the most recent lines
+    LOG_MAX_LINES = 2000
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Photo Converter")
@@ -36,12 +310,21 @@ class PhotoConverterGUI:
         self.quality = tk.IntVar(value=90)
         self.resize_width = tk.StringVar()
         self.resize_height = tk.StringVar()
+        self.resize_mode = tk.StringVar(value="fit")
         self.batch_mode = tk.BooleanVar(value=False)
         self.selected_files = []  # Store multiple selected files
+        self.folder_scan: Optional[FolderScan] = None
+        self.batch_control: Optional[BatchControl] = None
+        self.events = queue.Queue()
         
         # Create GUI
         self.create_menu()
         self.create_widgets()
+        self.root.after(self.DRAIN_INTERVAL_MS, self.process_events)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Keep the on-disk thumbnail cache within its budget
+        threading.Thread(target=self.thumbnail_grid.thumbnails.prune, daemon=True).start()
     
     def create_menu(self):
         """Create menu bar"""
@@ -154,23 +437,46 @@ class PhotoConverterGUI:
         ttk.Label(resize_frame, text="×").grid(row=0, column=1, padx=2)
         ttk.Entry(resize_frame, textvariable=self.resize_height, width=8).grid(
             row=0, column=2, padx=(2, 5))
-        ttk.Label(resize_frame, text="(optional)").grid(row=0, column=3, padx=(5, 0))
+        ttk.Combobox(resize_frame, textvariable=self.resize_mode, values=list(RESIZE_MODES),
+                     state="readonly", width=10).grid(row=0, column=3, padx=(5, 0))
+        ttk.Label(resize_frame, text="(optional, one side keeps aspect ratio)").grid(
+            row=0, column=4, padx=(5, 0))
         
-        # Convert button
-        self.convert_button = ttk.Button(main_frame, text="Convert", 
+        # Convert, pause and cancel buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=5, column=0, columnspan=3, pady=20)
+        self.convert_button = ttk.Button(button_frame, text="Convert", 
                                         command=self.start_conversion)
-        self.convert_button.grid(row=5, column=0, columnspan=3, pady=20)
+        self.convert_button.grid(row=0, column=0, padx=2)
+        self.pause_button = ttk.Button(button_frame, text="Pause", state='disabled',
+                                      command=self.toggle_pause)
+        self.pause_button.grid(row=0, column=1, padx=2)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", state='disabled',
+                                       command=self.cancel_conversion)
+        self.cancel_button.grid(row=0, column=2, padx=2)
+        
+        # Progress bar with throughput/ETA
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        progress_frame.columnconfigure(0, weight=1)
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.grid(row=1, column=0, sticky=tk.W)
         
-        # Progress bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        # Status log and thumbnail preview tabs
+        notebook = ttk.Notebook(main_frame)
+        notebook.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        main_frame.rowconfigure(7, weight=1)
         
-        # Status/log area
-        log_frame = ttk.LabelFrame(main_frame, text="Status", padding="5")
-        log_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        log_frame = ttk.Frame(notebook, padding="5")
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(7, weight=1)
+        notebook.add(log_frame, text="Status")
+        
+        self.thumbnail_grid = ThumbnailGrid(notebook, ThumbnailCache(), self.call_in_main_thread)
+        notebook.add(self.thumbnail_grid, text="Preview")
+        notebook.bind('<<NotebookTabChanged>>', lambda event: self.thumbnail_grid.refresh())
         
         # Create text widget with scrollbar
         text_frame = ttk.Frame(log_frame)
@@ -212,8 +518,10 @@ class PhotoConverterGUI:
         ]
         filename = filedialog.askopenfilename(filetypes=filetypes)
         if filename:
+            self.cancel_folder_scan()
             self.input_path.set(filename)
             self.selected_files = [filename]
+            self.thumbnail_grid.set_files([Path(filename)])
             self.batch_mode.set(False)
             self.update_mode_display()
             self.log_message(f"Selected file: {Path(filename).name}")
@@ -226,7 +534,9 @@ class PhotoConverterGUI:
         ]
         filenames = filedialog.askopenfilenames(filetypes=filetypes)
         if filenames:
+            self.cancel_folder_scan()
             self.selected_files = list(filenames)
+            self.thumbnail_grid.set_files([Path(f) for f in filenames])
             self.input_path.set(f"{len(filenames)} files selected")
             self.batch_mode.set(True)
             self.update_mode_display()
@@ -236,47 +546,70 @@ class PhotoConverterGUI:
         """Select input folder for batch processing"""
         folder = filedialog.askdirectory(title="Select folder containing images")
         if folder:
+            self.cancel_folder_scan()
             self.input_path.set(folder)
             self.selected_files = []
             self.batch_mode.set(True)
             self.update_mode_display()
-            # Count images in folder for preview
             folder_path = Path(folder)
             self.log_message(f"Selected folder: {folder_path}")
             
-            # Get detailed file analysis
-            image_files = self.converter.get_image_files(folder_path)
-            
-            # Also check for HEIC files if not supported
-            heic_files = list(folder_path.glob("*.heic")) + list(folder_path.glob("*.HEIC")) + \
-                        list(folder_path.glob("*.heif")) + list(folder_path.glob("*.HEIF"))
-            
-            self.log_message(f"Found {len(image_files)} supported image files")
-            
-            if heic_files and not self.converter.SUPPORTED_FORMATS.get('.heic'):
-                self.log_message(f"Found {len(heic_files)} HEIC files (not supported without pyheif)")
-                self.log_message("Install HEIC support: Tools → Install Dependencies")
-            elif heic_files:
-                self.log_message(f"HEIC files will be included in processing")
+            # Analyse the folder off the main loop; large or network folders
+            # can take a long time to list
+            self.mode_label.config(text="Batch: scanning folder...")
+            self.thumbnail_grid.set_files([])
+            self.folder_scan = FolderScan(folder_path, self.converter.SUPPORTED_FORMATS,
+                                          self.post_scan_update).start()
+    
+    def cancel_folder_scan(self):
+        """Stop the current folder scan, if any"""
+        if self.folder_scan is not None:
+            self.folder_scan.cancel()
+            self.folder_scan = None
+    
+    def post_scan_update(self, scan: FolderScan, summary: Dict[str, Any], finished: bool):
+        """FolderScan callback (scan thread): hand the counts to the main loop"""
+        self.events.put(('scan', (scan, summary, finished)))
+    
+    def show_scan_progress(self, scan: FolderScan, summary: Dict[str, Any]):
+        """Show live counts of a running scan (main thread)"""
+        if scan is not self.folder_scan:
+            return
+        text = f"Batch: scanning... {summary['images']} images in {summary['files']} files"
+        if summary['file_types']:
+            text += f" ({FolderScan.describe_types(summary['file_types'], limit=4)})"
+        self.mode_label.config(text=text)
+    
+    def scan_finished(self, scan: FolderScan, summary: Dict[str, Any]):
+        """Report a completed folder scan (main thread)"""
+        if scan is not self.folder_scan:
+            return
+        self.update_mode_display()
+        self.thumbnail_grid.set_files(scan.image_files)
+        if summary['error']:
+            self.log_message(f"Could not read folder: {summary['error']}")
+            return
+        
+        image_count = summary['images']
+        heic_count = summary['heic']
+        self.log_message(f"Found {image_count} supported image files")
+        
+        if heic_count and not self.converter.SUPPORTED_FORMATS.get('.heic'):
+            self.log_message(f"Found {heic_count} HEIC files (not supported without pyheif)")
+            self.log_message("Install HEIC support: Tools → Install Dependencies")
+        elif heic_count:
+            self.log_message(f"HEIC files will be included in processing")
+        
+        if not image_count and not heic_count:
+            self.log_message("No supported image files found in this folder")
+            self.log_message("Supported formats: " + ", ".join(self.converter.SUPPORTED_FORMATS.keys()))
             
-            if not image_files and not heic_files:
-                self.log_message("No supported image files found in this folder")
-                self.log_message("Supported formats: " + ", ".join(self.converter.SUPPORTED_FORMATS.keys()))
-                
-                # Show what files ARE in the folder
-                all_files = [f for f in folder_path.iterdir() if f.is_file()]
-                if all_files:
-                    self.log_message(f"Found {len(all_files)} files total, but none are supported image formats")
-            else:
-                # Show breakdown by file type
-                file_types = {}
-                for f in image_files:
-                    ext = f.suffix.lower()
-                    file_types[ext] = file_types.get(ext, 0) + 1
-                
-                if file_types:
-                    breakdown = ", ".join([f"{count} {ext[1:].upper()}" for ext, count in sorted(file_types.items())])
-                    self.log_message(f"File types: {breakdown}")
+            # Show what files ARE in the folder
+            if summary['files']:
+                self.log_message(f"Found {summary['files']} files total, but none are supported image formats")
+        elif summary['file_types']:
+            # Show breakdown by file type
+            self.log_message(f"File types: {FolderScan.describe_types(summary['file_types'])}")
     
     def select_output(self):
         """Select output file or folder"""
@@ -313,6 +646,8 @@ class PhotoConverterGUI:
         if self.batch_mode.get():
             if self.selected_files:
                 self.mode_label.config(text=f"Batch: {len(self.selected_files)} files")
+            elif self.folder_scan is not None and self.folder_scan.finished:
+                self.mode_label.config(text=f"Batch: Folder mode ({len(self.folder_scan.image_files)} images)")
             else:
                 self.mode_label.config(text="Batch: Folder mode")
         else:
@@ -323,7 +658,7 @@ class PhotoConverterGUI:
         def install_worker():
             try:
                 self.log_message("Installing dependencies...")
-                self.root.after(0, lambda: self.convert_button.config(state='disabled'))
+                self.call_in_main_thread(lambda: self.convert_button.config(state='disabled'))
                 
                 # Install basic dependencies
                 self.log_message("Installing basic dependencies: Pillow, click, tqdm")
@@ -353,7 +688,7 @@ class PhotoConverterGUI:
             except Exception as e:
                 self.log_message(f"Error during installation: {e}")
             finally:
-                self.root.after(0, lambda: self.convert_button.config(state='normal'))
+                self.call_in_main_thread(lambda: self.convert_button.config(state='normal'))
         
         # Run installation in separate thread
         install_thread = threading.Thread(target=install_worker, daemon=True)
@@ -406,10 +741,69 @@ Developed with Python and tkinter."""
         messagebox.showinfo("About Photo Converter", about_text)
     
     def log_message(self, message):
-        """Add message to log area"""
-        self.log_text.insert(tk.END, message + "\n")
+        """Add message to log area (safe to call from any thread)"""
+        self.events.put(('log', message))
+    
+    def post_progress(self, progress: BatchProgress):
+        """Report batch progress (safe to call from any thread)"""
+        self.events.put(('progress', (progress.done, progress.total, progress.describe())))
+    
+    def call_in_main_thread(self, callback):
+        """Run a callback on the Tk main loop (safe to call from any thread)"""
+        self.events.put(('call', callback))
+    
+    def process_events(self):
+        """Drain queued events into the UI, coalescing log lines and progress"""
+        lines = deque(maxlen=self.LOG_MAX_LINES)
+        progress = None
+        try:
+            for _ in range(self.MAX_EVENTS_PER_DRAIN):
+                try:
+                    kind, payload = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'log':
+                    lines.append(payload)
+                    continue
+                if kind == 'progress':
+                    # Only the latest progress matters
+                    progress = payload
+                    continue
+                # Keep ordering: flush the log before anything else touches the UI
+                self._append_log(lines)
+                lines.clear()
+                try:
+                    if kind == 'scan' and not payload[2]:
+                        # Live scan counts: the latest is enough
+                        self.show_scan_progress(payload[0], payload[1])
+                    elif kind == 'scan':
+                        self.scan_finished(payload[0], payload[1])
+                    else:
+                        payload()
+                except Exception as e:
+                    # One failing update must not stop the queue from draining
+                    lines.append(f"Internal error while updating the window: {e}")
+            self._append_log(lines)
+            if progress is not None:
+                done, total, text = progress
+                self.progress.config(maximum=max(total or 0, 1), value=done)
+                self.progress_label.config(text=text)
+        finally:
+            self.root.after(self.DRAIN_INTERVAL_MS, self.process_events)
+    
+    def _append_log(self, lines):
+        """Insert lines in one go and trim the view to LOG_MAX_LINES"""
+        if not lines:
+            return
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if line_count > self.LOG_MAX_LINES:
+            self.log_text.delete('1.0', f'{line_count - self.LOG_MAX_LINES + 1}.0')
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
+    
+    def clear_log(self):
+        """Clear the log area (after anything already queued)"""
+        self.call_in_main_thread(lambda: self.log_text.delete('1.0', tk.END))
     
     def validate_inputs(self):
         """Validate user inputs"""
@@ -444,55 +838,84 @@ Developed with Python and tkinter."""
         return True
     
     def get_resize_dimensions(self):
-        """Get resize dimensions tuple or None"""
-        if self.resize_width.get() and self.resize_height.get():
-            try:
-                return (int(self.resize_width.get()), int(self.resize_height.get()))
-            except ValueError:
-                return None
-        return None
+        """Get resize dimensions tuple (either side may be None) or None"""
+        if not (self.resize_width.get() or self.resize_height.get()):
+            return None
+        try:
+            width = int(self.resize_width.get()) if self.resize_width.get() else None
+            height = int(self.resize_height.get()) if self.resize_height.get() else None
+        except ValueError:
+            return None
+        return (width, height)
+    
+    def get_resize_mode(self):
+        """Get the resize mode, falling back to fit when only one side is given"""
+        mode = self.resize_mode.get()
+        dims = self.get_resize_dimensions()
+        # fill and max-pixels need both sides, width/height modes their own side;
+        # with one side, fit scales by that side whatever the mode
+        if dims and None in dims:
+            return 'fit'
+        return mode
     
     def start_conversion(self):
         """Start the conversion process in a separate thread"""
         if not self.validate_inputs():
             return
         
-        # Disable convert button and start progress
+        # Disable convert button; batches switch the bar to determinate progress
         self.convert_button.config(state='disabled')
+        self.progress.config(mode='indeterminate', value=0)
+        self.progress_label.config(text="")
         self.progress.start()
         
+        # Batches can be paused or cancelled between files
+        self.batch_control = None
+        if self.batch_mode.get():
+            self.batch_control = BatchControl()
+            self.pause_button.config(state='normal', text="Pause")
+            self.cancel_button.config(state='normal')
+        
         # Clear log
-        self.log_text.delete(1.0, tk.END)
+        self.clear_log()
         self.log_message("Starting conversion...")
         
+        # Read every setting here: the worker thread must not touch Tk variables
+        settings = {
+            'batch_mode': self.batch_mode.get(),
+            'input_path': Path(self.input_path.get()),
+            'selected_files': [Path(f) for f in self.selected_files],
+            'output_path': Path(self.output_path.get()),
+            'format_ext': f".{self.selected_format.get()}",
+            'quality': self.quality.get() if self.quality.get() != 90 else None,
+            'resize_dims': self.get_resize_dimensions(),
+            'resize_mode': self.get_resize_mode(),
+        }
+        
         # Start conversion in separate thread to prevent GUI freezing
-        conversion_thread = threading.Thread(target=self.perform_conversion)
+        conversion_thread = threading.Thread(target=self.perform_conversion, kwargs=settings)
         conversion_thread.daemon = True
         conversion_thread.start()
     
-    def perform_conversion(self):
-        """Perform the actual conversion"""
+    def perform_conversion(self, batch_mode: bool, input_path: Path, selected_files: List[Path],
+                           output_path: Path, format_ext: str, quality: Optional[int],
+                           resize_dims: Optional[tuple], resize_mode: str):
+        """Perform the actual conversion (on a worker thread, with settings read by start_conversion)"""
         try:
-            output_path = Path(self.output_path.get())
-            format_ext = f".{self.selected_format.get()}"
-            quality = self.quality.get() if self.quality.get() != 90 else None
-            resize_dims = self.get_resize_dimensions()
-            
             # Reset converter counters
             self.converter.converted_count = 0
             self.converter.failed_count = 0
             
-            if self.batch_mode.get():
+            if batch_mode:
                 # Batch processing - either multiple files or folder
-                if self.selected_files:
+                if selected_files:
                     # Multiple selected files
-                    image_files = [Path(f) for f in self.selected_files]
+                    image_files = selected_files
                     self.log_message(f"Processing {len(image_files)} selected files")
                 else:
                     # Folder processing
-                    input_path = Path(self.input_path.get())
                     self.log_message(f"Processing folder: {input_path}")
-                    image_files = self.converter.get_image_files(input_path)
+                    image_files = self.scanned_image_files(input_path)
                     
                     if not image_files:
                         self.log_message("No image files found in the input directory")
@@ -506,22 +929,31 @@ Developed with Python and tkinter."""
                 
                 self.log_message(f"Found {len(image_files)} image files to convert")
                 
-                # Process files
-                for i, image_file in enumerate(image_files, 1):
-                    output_file = output_path / f"{image_file.stem}{format_ext}"
-                    self.log_message(f"Converting ({i}/{len(image_files)}): {image_file.name}")
-                    
-                    success = self.converter.convert_image(image_file, output_file, 
-                                                         quality, resize_dims)
-                    if not success:
-                        self.log_message(f"Failed to convert: {image_file.name}")
+                # Process files in parallel worker processes
+                # Files with the same name get _1, _2, ... instead of overwriting each other
+                planner = OutputPlanner(output_path, format_ext)
+                pairs = [(image_file, planner.plan(image_file)) for image_file in image_files]
+                workers = min(default_worker_count(), len(pairs))
+                progress = BatchProgress(total=len(pairs))
+                self.call_in_main_thread(self.start_determinate_progress)
+                results = self.converter.convert_many(pairs, workers=workers, control=self.batch_control,
+                                                      quality=quality, resize=resize_dims,
+                                                      resize_mode=resize_mode)
+                for result in results:
+                    progress.update(result)
+                    if result.success:
+                        self.log_message(f"Converted ({progress.done}/{len(pairs)}): {result.input_path.name}")
+                    else:
+                        self.log_message(f"Failed to convert: {result.input_path.name}")
+                    self.post_progress(progress)
+                self.log_message(f"Finished in {progress.elapsed:.1f}s: {progress.describe()}")
+                if self.batch_control.cancelled:
+                    self.log_message(f"Cancelled: {len(pairs) - progress.done} files were not converted")
             
             else:
                 # Single file conversion
-                if self.selected_files:
-                    input_path = Path(self.selected_files[0])
-                else:
-                    input_path = Path(self.input_path.get())
+                if selected_files:
+                    input_path = selected_files[0]
                     
                 self.log_message(f"Converting: {input_path.name}")
                 self.log_message(f"Output: {output_path}")
@@ -530,13 +962,14 @@ Developed with Python and tkinter."""
                 output_path.parent.mkdir(parents=True, exist_ok=True)
                 
                 success = self.converter.convert_image(input_path, output_path, 
-                                                     quality, resize_dims)
+                                                     quality, resize_dims, resize_mode=resize_mode)
                 if not success:
                     self.log_message("Conversion failed!")
             
             # Show results
+            cancelled = self.batch_control is not None and self.batch_control.cancelled
             self.log_message("\n" + "="*50)
-            self.log_message("Conversion Complete!")
+            self.log_message("Conversion Cancelled" if cancelled else "Conversion Complete!")
             self.log_message(f"Successfully converted: {self.converter.converted_count} files")
             if self.converter.failed_count > 0:
                 self.log_message(f"Failed conversions: {self.converter.failed_count} files")
@@ -546,12 +979,62 @@ Developed with Python and tkinter."""
         
         finally:
             # Re-enable button and stop progress (must be done in main thread)
-            self.root.after(0, self.conversion_finished)
+            self.call_in_main_thread(self.conversion_finished)
+    
+    def scanned_image_files(self, folder: Path) -> List[Path]:
+        """Image files of a folder, reusing the background scan when it is still valid"""
+        scan = self.folder_scan
+        if scan is not None and scan.folder == folder:
+            if not scan.finished:
+                self.log_message("Waiting for folder scan to finish...")
+                scan.wait()
+            if scan.is_current():
+                return scan.image_files
+        return self.converter.get_image_files(folder)
+    
+    def toggle_pause(self):
+        """Pause or resume the running batch (files in progress still finish)"""
+        control = self.batch_control
+        if control is None or control.cancelled:
+            return
+        if control.paused:
+            control.resume()
+            self.pause_button.config(text="Pause")
+            self.log_message("Resumed")
+        else:
+            control.pause()
+            self.pause_button.config(text="Resume")
+            self.log_message("Paused: files in progress will finish first")
+    
+    def cancel_conversion(self):
+        """Stop the running batch after the files in progress"""
+        if self.batch_control is not None and not self.batch_control.cancelled:
+            self.batch_control.cancel()
+            self.pause_button.config(state='disabled')
+            self.cancel_button.config(state='disabled')
+            self.log_message("Cancelling: finishing files in progress...")
+    
+    def start_determinate_progress(self):
+        """Switch the progress bar from busy animation to files done (main thread)"""
+        self.progress.stop()
+        self.progress.config(mode='determinate', value=0)
+    
+    def on_close(self):
+        """Stop background work and close the window"""
+        self.cancel_folder_scan()
+        if self.batch_control is not None:
+            self.batch_control.cancel()
+        self.thumbnail_grid.close()
+        self.root.destroy()
     
     def conversion_finished(self):
         """Called when conversion is finished (runs in main thread)"""
         self.convert_button.config(state='normal')
+        self.pause_button.config(state='disabled', text="Pause")
+        self.cancel_button.config(state='disabled')
         self.progress.stop()
+        if str(self.progress.cget('mode')) == 'indeterminate':
+            self.progress.config(value=0)
 
 
 def main():
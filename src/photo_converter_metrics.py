@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Metrics - Aggregate per-stage timings into batch reports
+"""
+
+import bisect
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Stages recorded by PhotoConverter.convert_image, in pipeline order
+STAGES = ('cache', 'open', 'copy', 'decode', 'convert', 'resize', 'flatten', 'tune', 'encode')
+
+# Histogram bucket upper bounds in seconds (Prometheus style, cumulative)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+    
+    def cumulative(self) -> List[int]:
+        """Cumulative counts per bucket, the last entry being +Inf"""
+        result = []
+        running = 0
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, running in zip(BUCKETS + (float('inf'),), self.cumulative()):
+            if running >= rank:
+                return bound
+        return float('inf')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 6),
+            'buckets': {str(bound): count for bound, count in zip(BUCKETS + ('+Inf',), self.cumulative())},
+            'p50_le': self.quantile(0.5),
+            'p95_le': self.quantile(0.95),
+        }
+
+
+class MetricsReport:
+    """Collects per-file metrics from a batch and writes JSON/CSV/Prometheus reports"""
+    
+    def __init__(self):
+        self.files: List[Dict[str, Any]] = []
+        self.wall = {stage: Histogram() for stage in STAGES}
+        self.cpu_totals = {stage: 0.0 for stage in STAGES}
+        self.total_wall = Histogram()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.failed = 0
+    
+    def add(self, input_path: Path, output_path: Path, success: bool, metrics: Optional[Dict[str, Any]]):
+        """Record one conversion result"""
+        if not success:
+            self.failed += 1
+        row = {'input': str(input_path), 'output': str(output_path), 'success': success}
+        if metrics:
+            total = 0.0
+            for stage, times in metrics['stages'].items():
+                row[f'{stage}_wall'] = round(times['wall'], 6)
+                row[f'{stage}_cpu'] = round(times['cpu'], 6)
+                total += times['wall']
+                if stage in self.wall:
+                    self.wall[stage].observe(times['wall'])
+                    self.cpu_totals[stage] += times['cpu']
+            row['total_wall'] = round(total, 6)
+            row['bytes_in'] = metrics['bytes_in']
+            row['bytes_out'] = metrics['bytes_out']
+            self.total_wall.observe(total)
+            self.bytes_in += metrics['bytes_in']
+            self.bytes_out += metrics['bytes_out']
+        self.files.append(row)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'files': len(self.files),
+            'failed': self.failed,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'total_wall': self.total_wall.to_dict(),
+            'stages': {
+                stage: dict(self.wall[stage].to_dict(), cpu_seconds=round(self.cpu_totals[stage], 6))
+                for stage in STAGES if self.wall[stage].count
+            },
+        }
+    
+    def write(self, path: Path):
+        """Write the report as CSV (per-file rows) or JSON (summary + files) by suffix"""
+        if path.suffix.lower() == '.csv':
+            self.write_csv(path)
+        else:
+            self.write_json(path)
+    
+    def write_json(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': self.summary(), 'files': self.files}, f, indent=2)
+    
+    def write_csv(self, path: Path):
+        fields = ['input', 'output', 'success', 'total_wall', 'bytes_in', 'bytes_out']
+        for stage in STAGES:
+            fields += [f'{stage}_wall', f'{stage}_cpu']
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.files)
+    
+    def write_prometheus(self, path: Path):
+        """Write a node_exporter textfile-collector file (atomically)"""
+        lines = [
+            '# HELP photo_converter_stage_seconds Wall time per conversion stage.',
+            '# TYPE photo_converter_stage_seconds histogram',
+        ]
+        for stage in STAGES:
+            histogram = self.wall[stage]
+            if not histogram.count:
+                continue
+            for bound, count in zip(BUCKETS + ('+Inf',), histogram.cumulative()):
+                lines.append(f'photo_converter_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'photo_converter_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+            lines.append(f'photo_converter_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        lines += [
+            '# HELP photo_converter_stage_cpu_seconds_total CPU time per conversion stage.',
+            '# TYPE photo_converter_stage_cpu_seconds_total counter',
+        ]
+        for stage in STAGES:
+            if self.wall[stage].count:
+                lines.append(f'photo_converter_stage_cpu_seconds_total{{stage="{stage}"}} {self.cpu_totals[stage]:.6f}')
+        lines += [
+            '# HELP photo_converter_files_total Files processed in the last batch.',
+            '# TYPE photo_converter_files_total counter',
+            f'photo_converter_files_total{{result="converted"}} {len(self.files) - self.failed}',
+            f'photo_converter_files_total{{result="failed"}} {self.failed}',
+            '# HELP photo_converter_bytes_total Bytes read and written in the last batch.',
+            '# TYPE photo_converter_bytes_total counter',
+            f'photo_converter_bytes_total{{direction="in"}} {self.bytes_in}',
+            f'photo_converter_bytes_total{{direction="out"}} {self.bytes_out}',
+        ]
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
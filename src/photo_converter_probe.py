@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Probe - Header-only inspection and cost estimates for a batch
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Add the src directory to the path so we can import photo_converter
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import photo_converter
+from photo_converter import (HEIF_EXTENSIONS, PhotoConverter, Rendition, format_duration, register_heif,
+                             rendition_path, target_size)
+
+# Rough single-core costs for typical camera photos at the default profile,
+# per megapixel. Use --calibrate to measure the real ones on a sample.
+DECODE_MS_PER_MP = {'JPEG': 10.0, 'PNG': 20.0, 'WEBP': 20.0, 'TIFF': 4.0, 'BMP': 2.0, 'GIF': 15.0,
+                    'HEIF': 60.0}
+ENCODE_MS_PER_MP = {'JPEG': 12.0, 'PNG': 60.0, 'WEBP': 90.0, 'TIFF': 3.0, 'BMP': 2.0, 'GIF': 40.0}
+RESIZE_MS_PER_MP = 8.0
+FILE_OVERHEAD_MS = 5.0
+DEFAULT_MS_PER_MP = 30.0
+
+# Typical output kilobytes per megapixel of a photo (raw formats: 3 bytes/pixel)
+OUTPUT_KB_PER_MP = {'JPEG': 350.0, 'WEBP': 200.0, 'PNG': 1800.0, 'GIF': 600.0, 'TIFF': 2930.0,
+                    'BMP': 2930.0}
+DEFAULT_KB_PER_MP = 1000.0
+
+# EXIF orientation tag
+ORIENTATION_TAG = 0x0112
+
+
+class ProbeResult(NamedTuple):
+    """Header facts about one image; ``error`` is set when it must be rejected"""
+    path: Path
+    format: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    mode: Optional[str] = None
+    orientation: int = 1
+    frames: int = 1
+    file_bytes: int = 0
+    error: Optional[str] = None
+    
+    @property
+    def megapixels(self) -> float:
+        return self.width * self.height / 1e6
+
+
+def probe_file(path: Path) -> ProbeResult:
+    """Read an image's header without decoding any pixels.
+    
+    Empty and unidentifiable files, and images larger than Pillow's
+    decompression-bomb limit (``Image.MAX_IMAGE_PIXELS``), come back with
+    ``error`` set. Damage inside the pixel data can only be found by
+    decoding, so such files still pass.
+    """
+    from PIL import Image
+    
+    try:
+        file_bytes = path.stat().st_size
+    except OSError as e:
+        return ProbeResult(path, error=f"unreadable: {e.strerror or e}")
+    if not file_bytes:
+        return ProbeResult(path, error="empty file")
+    
+    is_heif = path.suffix.lower() in HEIF_EXTENSIONS
+    if is_heif:
+        register_heif()
+    try:
+        # Read after register_heif(), which may fall back to pyheif
+        if is_heif and photo_converter.USE_PYHEIF:
+            # pyheif has no Pillow plugin: read the container header instead
+            import pyheif
+            container = pyheif.open_container(str(path))
+            primary = container.primary_image.image
+            width, height = primary.size
+            result = ProbeResult(path, 'HEIF', width, height, primary.mode,
+                                 frames=len(container.top_level_images), file_bytes=file_bytes)
+        else:
+            with warnings.catch_warnings():
+                # Over the limit is a warning up to twice the limit, an error beyond
+                warnings.simplefilter('error', Image.DecompressionBombWarning)
+                with Image.open(path) as img:
+                    orientation = img.getexif().get(ORIENTATION_TAG, 1)
+                    result = ProbeResult(path, img.format, img.width, img.height, img.mode,
+                                         orientation, getattr(img, 'n_frames', 1), file_bytes)
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        return ProbeResult(path, file_bytes=file_bytes,
+                           error=f"decompression bomb (over {Image.MAX_IMAGE_PIXELS} pixels)")
+    except Exception as e:
+        return ProbeResult(path, file_bytes=file_bytes, error=f"corrupt or unsupported: {e}")
+    
+    if Image.MAX_IMAGE_PIXELS and result.width * result.height > Image.MAX_IMAGE_PIXELS:
+        return result._replace(error=f"decompression bomb ({result.width}x{result.height} pixels)")
+    if not result.width or not result.height:
+        return result._replace(error="invalid dimensions")
+    return result
+
+
+def output_targets(output_path: Path, convert_kwargs: Dict[str, Any]) -> List[Tuple[Path, Optional[tuple], str]]:
+    """(path, resize box, resize mode) of every output convert_image would write"""
+    resize = convert_kwargs.get('resize')
+    resize_mode = convert_kwargs.get('resize_mode', 'exact')
+    renditions: Optional[List[Rendition]] = convert_kwargs.get('renditions')
+    if renditions:
+        return [(rendition_path(output_path, r), r.resize or resize, r.resize_mode or resize_mode)
+                for r in renditions]
+    return [(output_path, resize, resize_mode)]
+
+
+def _decoded_megapixels(probe: ProbeResult, sizes: List[Optional[Tuple[int, int]]],
+                        reducing_gap: Optional[float]) -> float:
+    """Megapixels actually decoded, allowing for JPEG DCT scaling (draft)"""
+    if probe.format != 'JPEG' or reducing_gap is None or not all(sizes):
+        return probe.megapixels
+    wanted_width = max(size[0] for size in sizes) * reducing_gap
+    wanted_height = max(size[1] for size in sizes) * reducing_gap
+    for scale in (8, 4, 2):
+        if probe.width / scale >= wanted_width and probe.height / scale >= wanted_height:
+            return probe.megapixels / (scale * scale)
+    return probe.megapixels
+
+
+class BatchPlan:
+    """Probed inputs of a batch with estimated output size and runtime.
+    
+    Estimates use the per-megapixel cost tables above (decode, resize and
+    encode time, output bytes) applied to every output's exact size, which
+    is known from the headers. ``calibrate`` replaces the tables' guesses
+    with ratios measured by converting a few of the files.
+    """
+    
+    def __init__(self, convert_kwargs: Dict[str, Any], workers: int = 1):
+        self.convert_kwargs = convert_kwargs
+        self.workers = max(1, workers)
+        self.files: List[Dict[str, Any]] = []
+        self.rejected: List[ProbeResult] = []
+        self.time_ratio = 1.0
+        self.size_ratio = 1.0
+        self.calibrated_samples = 0
+    
+    def add(self, input_path: Path, output_path: Path) -> ProbeResult:
+        """Probe one input and estimate the cost of converting it"""
+        probe = probe_file(input_path)
+        if probe.error:
+            self.rejected.append(probe)
+            return probe
+        
+        reducing_gap = PhotoConverter.DOWNSCALE_MODES[self.convert_kwargs.get('downscale', 'balanced')]
+        targets = output_targets(output_path, self.convert_kwargs)
+        sizes = [target_size((probe.width, probe.height), box, mode) if box else None
+                 for _, box, mode in targets]
+        decoded_mp = _decoded_megapixels(probe, sizes, reducing_gap)
+        
+        milliseconds = FILE_OVERHEAD_MS + decoded_mp * DECODE_MS_PER_MP.get(probe.format, DEFAULT_MS_PER_MP)
+        output_mp = 0.0
+        output_bytes = 0.0
+        for (target_path, _, _), size in zip(targets, sizes):
+            format_name = PhotoConverter.SUPPORTED_FORMATS.get(target_path.suffix.lower())
+            megapixels = size[0] * size[1] / 1e6 if size else probe.megapixels
+            if size:
+                milliseconds += decoded_mp * RESIZE_MS_PER_MP
+            milliseconds += megapixels * ENCODE_MS_PER_MP.get(format_name, DEFAULT_MS_PER_MP)
+            output_mp += megapixels
+            output_bytes += megapixels * OUTPUT_KB_PER_MP.get(format_name, DEFAULT_KB_PER_MP) * 1024
+        
+        self.files.append({
+            'input': str(input_path),
+            'output': str(output_path),
+            'format': probe.format,
+            'width': probe.width,
+            'height': probe.height,
+            'mode': probe.mode,
+            'orientation': probe.orientation,
+            'frames': probe.frames,
+            'bytes_in': probe.file_bytes,
+            'megapixels': round(probe.megapixels, 3),
+            'output_megapixels': round(output_mp, 3),
+            'estimated_bytes': int(output_bytes),
+            'estimated_seconds': milliseconds / 1000,
+        })
+        return probe
+    
+    def calibrate(self, samples: int = 3, work_dir: Optional[Path] = None):
+        """Convert up to ``samples`` files (spread over the batch) into a
+        temporary directory and scale the estimates by measured/estimated"""
+        if not self.files or samples < 1:
+            return
+        step = max(1, len(self.files) // samples)
+        chosen = self.files[::step][:samples]
+        # A shared output cache would turn the samples into cache hits
+        convert_kwargs = {name: value for name, value in self.convert_kwargs.items()
+                          if name not in ('output_cache', 'cache_link')}
+        converter = PhotoConverter()
+        tmp = Path(tempfile.mkdtemp(prefix='photo-converter-probe-', dir=work_dir))
+        try:
+            measured_seconds = measured_bytes = 0.0
+            estimated_seconds = estimated_bytes = 0.0
+            for index, row in enumerate(chosen):
+                output = tmp / f"{index}{Path(row['output']).suffix}"
+                start = time.perf_counter()
+                if not converter.convert_image(Path(row['input']), output, **convert_kwargs):
+                    continue
+                measured_seconds += time.perf_counter() - start
+                measured_bytes += sum(path.stat().st_size for path, _, _ in output_targets(output, convert_kwargs))
+                estimated_seconds += row['estimated_seconds']
+                estimated_bytes += row['estimated_bytes']
+                self.calibrated_samples += 1
+            if estimated_seconds and estimated_bytes:
+                self.time_ratio = measured_seconds / estimated_seconds
+                self.size_ratio = measured_bytes / estimated_bytes
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    
+    @property
+    def input_megapixels(self) -> float:
+        return sum(row['megapixels'] for row in self.files)
+    
+    @property
+    def output_megapixels(self) -> float:
+        return sum(row['output_megapixels'] for row in self.files)
+    
+    @property
+    def estimated_bytes(self) -> int:
+        return int(sum(row['estimated_bytes'] for row in self.files) * self.size_ratio)
+    
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(row['estimated_seconds'] for row in self.files) * self.time_ratio
+    
+    @property
+    def wall_seconds(self) -> float:
+        """CPU time spread over the workers (never less than the slowest file)"""
+        if not self.files:
+            return 0.0
+        slowest = max(row['estimated_seconds'] for row in self.files) * self.time_ratio
+        return max(self.cpu_seconds / min(self.workers, len(self.files)), slowest)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'files': len(self.files),
+            'rejected': len(self.rejected),
+            'bytes_in': sum(row['bytes_in'] for row in self.files),
+            'input_megapixels': round(self.input_megapixels, 3),
+            'output_megapixels': round(self.output_megapixels, 3),
+            'estimated_bytes': self.estimated_bytes,
+            'estimated_cpu_seconds': round(self.cpu_seconds, 3),
+            'estimated_seconds': round(self.wall_seconds, 3),
+            'workers': self.workers,
+            'calibrated_samples': self.calibrated_samples,
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'files': self.files,
+            'rejected': [{'input': str(probe.path), 'error': probe.error} for probe in self.rejected],
+        }
+    
+    def describe(self) -> List[str]:
+        """Human-readable plan, one line per entry"""
+        megabytes_in = sum(row['bytes_in'] for row in self.files) / (1024 * 1024)
+        basis = (f"Estimates calibrated on {self.calibrated_samples} converted file(s)" if self.calibrated_samples
+                 else "Estimates use typical photo costs (probe --calibrate N measures real ones)")
+        lines = [
+            f"Files: {len(self.files)} to convert, {len(self.rejected)} rejected",
+            f"Input: {self.input_megapixels:,.1f} MP in {megabytes_in:,.1f} MB",
+            f"Output: {self.output_megapixels:,.1f} MP, about {self.estimated_bytes / (1024 * 1024):,.1f} MB",
+            f"Runtime: about {format_duration(self.wall_seconds)} with {self.workers} worker(s) "
+            f"({format_duration(self.cpu_seconds)} CPU)",
+            basis,
+        ]
+        for probe in self.rejected:
+            lines.append(f"Rejected: {probe.path}: {probe.error}")
+        return lines
+
+
+def plan_batch(pairs: Iterable[Tuple[Path, Path]], convert_kwargs: Dict[str, Any],
+               workers: int = 1) -> BatchPlan:
+    """Probe every (input, output) pair of a batch"""
+    plan = BatchPlan(convert_kwargs, workers)
+    for input_path, output_path in pairs:
+        plan.add(input_path, output_path)
+    return plan
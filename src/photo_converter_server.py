@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Server - Long-running conversion service over HTTP or a Unix socket
+"""
+
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+# Add the src directory to the path so we can import photo_converter
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from photo_converter import (ENCODER_PROFILES, RESAMPLE_FILTERS, RESIZE_MODES, PhotoConverter,
+                             _convert_in_worker, default_worker_count, parse_byte_size, parse_resize)
+
+# Largest request body accepted by default
+DEFAULT_MAX_UPLOAD = 100 * 1024 * 1024
+
+
+class ParameterError(ValueError):
+    """An invalid /convert query parameter; the message is safe to send to clients"""
+    
+    def __init__(self, message: str, detail: str = ''):
+        super().__init__(message)
+        self.detail = detail
+
+
+class WorkerCrashed(Exception):
+    """A worker process died (e.g. killed for memory) during a conversion"""
+
+
+def _parse_param(params: Dict[str, str], name: str, parse, valid=lambda value: True,
+                 message: Optional[str] = None):
+    """Parse one parameter, raising ParameterError with a fixed message when invalid"""
+    message = message or f"Invalid '{name}' parameter"
+    try:
+        value = parse(params[name])
+    except (ValueError, TypeError) as e:
+        raise ParameterError(message, f"{name}={params[name]!r}: {e}") from e
+    if not valid(value):
+        raise ParameterError(message, f"{name}={params[name]!r}")
+    return value
+
+
+def parse_convert_params(query: str) -> Tuple[str, Dict[str, Any]]:
+    """Turn /convert query parameters into (output extension, convert_image kwargs).
+    
+    Raises ParameterError with a fixed client-facing message for invalid values.
+    """
+    params = {name: values[-1] for name, values in parse_qs(query).items()}
+    
+    if not params.get('format'):
+        raise ParameterError("Missing 'format' parameter")
+    supported = PhotoConverter().SUPPORTED_FORMATS
+    extension = _parse_param(params, 'format', lambda text: '.' + text.lower().lstrip('.'),
+                             lambda value: value in supported, "Unsupported 'format' parameter")
+    
+    kwargs: Dict[str, Any] = {}
+    if 'quality' in params:
+        kwargs['quality'] = _parse_param(params, 'quality', int, lambda value: 1 <= value <= 100,
+                                         "'quality' must be between 1 and 100")
+    resize_mode = 'exact'
+    if 'resize_mode' in params:
+        resize_mode = _parse_param(params, 'resize_mode', str, lambda value: value in RESIZE_MODES)
+    kwargs['resize_mode'] = resize_mode
+    if params.get('resize'):
+        kwargs['resize'] = _parse_param(params, 'resize', lambda text: parse_resize(text, resize_mode))
+    if 'resample' in params:
+        kwargs['resample'] = _parse_param(params, 'resample', str, lambda value: value in RESAMPLE_FILTERS)
+    if 'downscale' in params:
+        kwargs['downscale'] = _parse_param(params, 'downscale', str,
+                                           lambda value: value in PhotoConverter.DOWNSCALE_MODES)
+    if 'profile' in params:
+        kwargs['encoder_profile'] = _parse_param(params, 'profile', str, lambda value: value in ENCODER_PROFILES)
+    if 'target_size' in params:
+        kwargs['target_bytes'] = _parse_param(params, 'target_size', parse_byte_size)
+    if 'target_ssim' in params:
+        kwargs['target_ssim'] = _parse_param(params, 'target_ssim', float, lambda value: 0 < value <= 1,
+                                             "'target_ssim' must be between 0 and 1")
+    if 'lossless' in params:
+        kwargs['lossless'] = params['lossless'].lower() not in ('0', 'false', 'no')
+    return extension, kwargs
+
+
+def _tiny_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ConversionService:
+    """Warm worker pool converting in-memory images with PhotoConverter"""
+    
+    def __init__(self, workers: Optional[int] = None, max_upload: int = DEFAULT_MAX_UPLOAD):
+        self.workers = workers or default_worker_count()
+        self.max_upload = max_upload
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.restarts = 0
+        # Load every plugin so Image.MIME knows each output format
+        Image.init()
+        self.started = time.time()
+        # Handler threads update the counters concurrently
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+    
+    def warm_up(self):
+        """Start every worker and load the codecs before the first request"""
+        tiny = _tiny_image()
+        futures = [self.executor.submit(_convert_in_worker, Path('warmup.png'), Path('warmup.jpg'),
+                                        {}, False, tiny, True)
+                   for _ in range(self.workers)]
+        wait(futures)
+    
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a pool broken by a dead worker (once, however many threads noticed)"""
+        with self.lock:
+            if self.executor is not broken:
+                return
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.restarts += 1
+        broken.shutdown(wait=False)
+    
+    def convert(self, data: bytes, source_name: str, extension: str,
+                convert_kwargs: Dict[str, Any]) -> Optional[bytes]:
+        """Convert one image; returns the encoded output or None on failure.
+        
+        Raises WorkerCrashed when the worker process dies; the pool is
+        replaced so later requests get fresh workers.
+        """
+        with self.lock:
+            self.requests += 1
+        # The names only select codecs (e.g. HEIC input, output format); nothing touches disk
+        args = (_convert_in_worker, Path(source_name), Path('output' + extension),
+                convert_kwargs, False, data, True)
+        executor = self.executor
+        try:
+            future = executor.submit(*args)
+        except BrokenProcessPool:
+            # Broken by an earlier crash: this request is not to blame, retry it
+            self._restart(executor)
+            executor = self.executor
+            future = executor.submit(*args)
+        try:
+            success, _, outputs, _ = future.result()
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            with self.lock:
+                self.failures += 1
+            raise WorkerCrashed(str(e)) from e
+        if not success or not outputs:
+            with self.lock:
+                self.failures += 1
+            return None
+        return outputs[0][1]
+    
+    def health(self) -> Dict[str, Any]:
+        with self.lock:
+            requests, failures, restarts = self.requests, self.failures, self.restarts
+        # The pool flags itself broken as soon as a worker dies, even between requests
+        broken = bool(getattr(self.executor, '_broken', False))
+        return {
+            'status': 'degraded' if broken else 'ok',
+            'pool': 'broken' if broken else 'ok',
+            'worker_restarts': restarts,
+            'workers': self.workers,
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'requests': requests,
+            'failures': failures,
+        }
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API: POST /convert?format=webp&... with the image as the body, GET /health"""
+    
+    server_version = 'photo-converter'
+    protocol_version = 'HTTP/1.1'
+    
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+    
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def log_error(self, format: str, *args):
+        # Errors are always logged, whatever the verbosity
+        super().log_message(format, *args)
+    
+    def _reply(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _error(self, status: int, message: str):
+        self._reply(status, json.dumps({'error': message}).encode('utf-8') + b'\n', 'application/json')
+    
+    def do_GET(self):
+        if urlsplit(self.path).path != '/health':
+            self._error(404, 'Not found')
+            return
+        health = self.server.service.health()
+        status = 200 if health['status'] == 'ok' else 503
+        self._reply(status, json.dumps(health).encode('utf-8') + b'\n', 'application/json')
+    
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            # The unread body would otherwise be parsed as the next request
+            self.close_connection = True
+            self._error(404, 'Not found')
+            return
+        
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._error(411, 'Content-Length required')
+            return
+        if length > service.max_upload:
+            self.close_connection = True
+            self._error(413, f'Upload larger than {service.max_upload} bytes')
+            return
+        data = self.rfile.read(length)
+        
+        try:
+            extension, convert_kwargs = parse_convert_params(url.query)
+        except ParameterError as e:
+            if e.detail:
+                self.log_error('Bad parameter: %s', e.detail)
+            self._error(400, str(e))
+            return
+        
+        # Optional original file name, so HEIC uploads reach the right decoder
+        source_name = Path(parse_qs(url.query).get('filename', ['upload'])[-1]).name or 'upload'
+        start = time.perf_counter()
+        try:
+            output = service.convert(data, source_name, extension, convert_kwargs)
+        except WorkerCrashed as e:
+            self.log_error('Worker crashed converting %s: %s', source_name, e)
+            self._error(503, 'Worker crashed; the service restarted its workers, try again')
+            return
+        except Exception as e:
+            self.log_error('Error converting %s: %r', source_name, e)
+            self._error(500, 'Internal error')
+            return
+        elapsed = time.perf_counter() - start
+        if output is None:
+            self._error(422, 'Conversion failed')
+            return
+        format_name = PhotoConverter.SUPPORTED_FORMATS[extension]
+        self._reply(200, output, Image.MIME.get(format_name, 'application/octet-stream'),
+                    {'X-Conversion-Seconds': f'{elapsed:.4f}'})
+
+
+class ConversionHTTPServer(ThreadingHTTPServer):
+    """Localhost HTTP server handing conversions to a ConversionService"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], service: ConversionService, verbose: bool = False):
+        super().__init__(address, ConversionRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+class ConversionUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """The same HTTP API on a Unix domain socket (e.g. curl --unix-socket)"""
+    
+    daemon_threads = True
+    
+    def __init__(self, socket_path: Path, service: ConversionService, verbose: bool = False):
+        # A socket left behind by a previous run would make bind() fail
+        if socket_path.exists() and socket_path.is_socket():
+            socket_path.unlink()
+        super().__init__(str(socket_path), ConversionRequestHandler)
+        self.socket_path = socket_path
+        self.service = service
+        self.verbose = verbose
+    
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, socket_path: Optional[Path] = None,
+          workers: Optional[int] = None, max_upload: int = DEFAULT_MAX_UPLOAD,
+          verbose: bool = False, ready=None):
+    """Run the conversion service until interrupted.
+    
+    ``ready`` is an optional callable receiving a description of the
+    listening address once the workers are warm.
+    """
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    
+    # Service managers stop daemons with SIGTERM: shut down like Ctrl+C
+    signal.signal(signal.SIGTERM, stop)
+    
+    service = ConversionService(workers, max_upload)
+    try:
+        service.warm_up()
+        if socket_path is not None:
+            server = ConversionUnixServer(socket_path, service, verbose)
+            address = f"unix:{socket_path}"
+        else:
+            server = ConversionHTTPServer((host, port), service, verbose)
+            address = f"http://{host}:{server.server_address[1]}"
+        with server:
+            if ready:
+                ready(address)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        service.close()
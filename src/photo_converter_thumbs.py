@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Thumbnails - Preview thumbnails with a memory + disk LRU cache
+"""
+
+import base64
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Add the src directory to the path so we can import photo_converter
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from photo_converter import PhotoConverter
+
+# Longest side of preview thumbnails, in pixels
+THUMBNAIL_SIZE = 128
+
+# Thumbnails kept in memory (PNG bytes, a few KB each)
+MEMORY_ITEMS = 2000
+
+# Default on-disk cache budget
+DISK_MAX_BYTES = 200 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Per-user thumbnail cache directory (XDG_CACHE_HOME or ~/.cache)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'photo-converter' / 'thumbnails'
+
+
+def make_thumbnail(path: Path, size: int = THUMBNAIL_SIZE) -> bytes:
+    """Decode a small preview of an image and return it as PNG bytes.
+    
+    ``thumbnail`` asks the decoder for a reduced image first (JPEG DCT
+    scaling, embedded HEIF thumbnails), so large photos are never fully
+    decoded. EXIF orientation is applied so previews look right.
+    """
+    from PIL import Image, ImageOps
+    
+    converter = PhotoConverter()
+    with converter.open_image(path) as img:
+        img.thumbnail((size, size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = converter.normalize_mode(img)
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def png_to_photo_data(data: bytes) -> str:
+    """PNG bytes in the base64 form tk.PhotoImage(data=...) accepts"""
+    return base64.b64encode(data).decode('ascii')
+
+
+class ThumbnailCache:
+    """Thumbnails keyed by path, size and mtime, in memory and on disk.
+    
+    The in-memory layer is an LRU of ``memory_items`` PNG blobs. On disk,
+    thumbnails live under ``<root>/<xx>/<key>.png`` and are written with a
+    temp file + rename; a hit refreshes the file's mtime, which ``prune``
+    uses for least-recently-used eviction. A changed file gets a new key,
+    so stale thumbnails simply age out. Safe to use from several threads.
+    """
+    
+    def __init__(self, root: Optional[Path] = None, size: int = THUMBNAIL_SIZE,
+                 memory_items: int = MEMORY_ITEMS):
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.size = size
+        self.memory_items = memory_items
+        self.memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def key(self, path: Path) -> Optional[str]:
+        """Cache key for a file as it is now (None if it can't be stat'ed)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        identity = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    
+    def _disk_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.png"
+    
+    def peek(self, key: str) -> Optional[bytes]:
+        """Memory-only lookup, cheap enough for the UI thread"""
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+            return data
+    
+    def _remember(self, key: str, data: bytes):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+    
+    def get(self, path: Path) -> Optional[bytes]:
+        """Thumbnail PNG for a file from memory, disk or a fresh decode (None on failure)"""
+        key = self.key(path)
+        if key is None:
+            return None
+        data = self.peek(key)
+        if data is not None:
+            return data
+        
+        disk_path = self._disk_path(key)
+        try:
+            data = disk_path.read_bytes()
+            now = time.time()
+            os.utime(disk_path, (now, now))
+        except OSError:
+            try:
+                data = make_thumbnail(path, self.size)
+            except Exception:
+                # Corrupt, unsupported or oversized images just get no preview
+                return None
+            self._store(disk_path, data)
+        self._remember(key, data)
+        return data
+    
+    def _store(self, disk_path: Path, data: bytes):
+        try:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix='.tmp-', dir=disk_path.parent)
+        except OSError:
+            # Read-only or full cache directory: keep the thumbnail in memory only
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, disk_path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+    
+    def prune(self, max_bytes: int = DISK_MAX_BYTES) -> Tuple[int, int]:
+        """Evict least recently used thumbnails until the disk cache fits in
+        ``max_bytes``. Returns (files removed, bytes freed)."""
+        from photo_converter_cache import evict_lru, sharded_entries
+        return evict_lru(sharded_entries(self.root), max_bytes)
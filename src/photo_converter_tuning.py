@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Photo Converter Tuning - Pick an encoder quality per image for a size or SSIM target
+"""
+
+import hashlib
+import io
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+# Longest side of the probe image used for SSIM searches and fingerprints
+PROBE_SIZE = 256
+
+# Quality range searched (above 95 mostly wastes bytes for JPEG/WebP)
+MIN_QUALITY = 10
+MAX_QUALITY = 95
+
+
+def make_probe(img: Image.Image) -> Image.Image:
+    """Small copy of an image used to search quality cheaply"""
+    probe = img.copy()
+    probe.thumbnail((PROBE_SIZE, PROBE_SIZE), Image.Resampling.BOX, reducing_gap=2.0)
+    return probe
+
+
+def ssim(reference: Image.Image, candidate: Image.Image, block: int = 8) -> float:
+    """Mean structural similarity of two same-sized images (luma, 8x8 blocks)"""
+    ref = reference.convert('L')
+    cand = candidate.convert('L')
+    width, height = ref.size
+    ref_pixels = ref.tobytes()
+    cand_pixels = cand.tobytes()
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    total = 0.0
+    blocks = 0
+    n = block * block
+    for top in range(0, height - block + 1, block):
+        for left in range(0, width - block + 1, block):
+            sum_x = sum_y = sum_xx = sum_yy = sum_xy = 0
+            for row in range(top, top + block):
+                start = row * width + left
+                for x, y in zip(ref_pixels[start:start + block], cand_pixels[start:start + block]):
+                    sum_x += x
+                    sum_y += y
+                    sum_xx += x * x
+                    sum_yy += y * y
+                    sum_xy += x * y
+            mu_x = sum_x / n
+            mu_y = sum_y / n
+            var_x = sum_xx / n - mu_x * mu_x
+            var_y = sum_yy / n - mu_y * mu_y
+            cov = sum_xy / n - mu_x * mu_y
+            total += (((2 * mu_x * mu_y + c1) * (2 * cov + c2))
+                      / ((mu_x * mu_x + mu_y * mu_y + c1) * (var_x + var_y + c2)))
+            blocks += 1
+    if not blocks:
+        # Image smaller than one block: compare directly
+        return 1.0 if ref_pixels == cand_pixels else 0.0
+    return total / blocks
+
+
+def encode(img: Image.Image, format_name: str, quality: int, save_kwargs: Dict) -> bytes:
+    """Encode an image in memory at the given quality"""
+    buffer = io.BytesIO()
+    img.save(buffer, format=format_name, **dict(save_kwargs, quality=quality))
+    return buffer.getvalue()
+
+
+class QualityTuner:
+    """Binary-searches encoder quality per image, remembering results.
+    
+    Results are cached in memory and, when ``cache_path`` is given, in a
+    SQLite file that several worker processes (or later runs) can share.
+    Cache keys are a fingerprint of the image's probe pixels plus the
+    format, encoder options and targets, so reruns skip the search.
+    """
+    
+    def __init__(self, cache_path: Optional[Path] = None):
+        self.cache_path = cache_path
+        self.memory: Dict[str, int] = {}
+        self.db = None
+        if cache_path is not None:
+            self.db = sqlite3.connect(str(cache_path), timeout=30)
+            self.db.execute('CREATE TABLE IF NOT EXISTS quality_cache (key TEXT PRIMARY KEY, quality INTEGER)')
+            self.db.commit()
+    
+    def _lookup(self, key: str) -> Optional[int]:
+        if key in self.memory:
+            return self.memory[key]
+        if self.db is not None:
+            row = self.db.execute('SELECT quality FROM quality_cache WHERE key = ?', (key,)).fetchone()
+            if row:
+                self.memory[key] = row[0]
+                return row[0]
+        return None
+    
+    def _store(self, key: str, quality: int):
+        self.memory[key] = quality
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO quality_cache (key, quality) VALUES (?, ?)', (key, quality))
+            self.db.commit()
+    
+    def choose(self, img: Image.Image, format_name: str, save_kwargs: Dict,
+               target_bytes: Optional[int] = None,
+               target_ssim: Optional[float] = None) -> Tuple[int, Optional[bytes]]:
+        """Return (quality, encoded bytes if already produced at that quality)"""
+        probe = make_probe(img)
+        digest = hashlib.sha1(probe.tobytes())
+        digest.update(repr((img.size, img.mode, format_name, sorted(save_kwargs.items()),
+                            target_bytes, target_ssim)).encode('utf-8'))
+        key = digest.hexdigest()
+        
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached, None
+        
+        quality = MAX_QUALITY
+        if target_ssim is not None:
+            quality = self._search_ssim(probe, format_name, save_kwargs, target_ssim)
+        
+        data = None
+        if target_bytes is not None:
+            quality, data = self._search_size(img, format_name, save_kwargs, target_bytes, quality)
+        
+        self._store(key, quality)
+        return quality, data
+    
+    @staticmethod
+    def _search_ssim(probe: Image.Image, format_name: str, save_kwargs: Dict, target: float) -> int:
+        """Lowest quality whose probe encode reaches the SSIM target"""
+        low, high = MIN_QUALITY, MAX_QUALITY
+        best = MAX_QUALITY
+        while low <= high:
+            mid = (low + high) // 2
+            with Image.open(io.BytesIO(encode(probe, format_name, mid, save_kwargs))) as decoded:
+                score = ssim(probe, decoded)
+            if score >= target:
+                best = mid
+                high = mid - 1
+            else:
+                low = mid + 1
+        return best
+    
+    @staticmethod
+    def _search_size(img: Image.Image, format_name: str, save_kwargs: Dict, target: int,
+                     ceiling: int) -> Tuple[int, bytes]:
+        """Highest quality (up to ceiling) whose full-size encode fits in target bytes"""
+        data = encode(img, format_name, ceiling, save_kwargs)
+        if len(data) <= target:
+            return ceiling, data
+        low, high = MIN_QUALITY, ceiling - 1
+        best_quality, best_data = None, None
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = encode(img, format_name, mid, save_kwargs)
+            if len(candidate) <= target:
+                best_quality, best_data = mid, candidate
+                low = mid + 1
+            else:
+                high = mid - 1
+        if best_quality is None:
+            # Even the lowest quality is too big: use it anyway, it's the closest
+            return MIN_QUALITY, encode(img, format_name, MIN_QUALITY, save_kwargs)
+        return best_quality, best_data
@@ -0,0 +1,42 @@
+"""
+Shared fixtures for the Photo Converter tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the path so we can import photo_converter
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from photo_converter_bench import synthesize_image
+
+
+@pytest.fixture
+def make_image(tmp_path):
+    """Factory writing a photo-like test image: make_image('a.jpg', (640, 480))"""
+    def make(name: str, size=(320, 240), directory: Path = None) -> Path:
+        path = (directory or tmp_path) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        synthesize_image(path, size)
+        return path
+    return make
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    @pytest.fixture
+    def benchmark():
+        """Minimal stand-in for pytest-benchmark's fixture: one timed call.
+
+        Install pytest-benchmark (the dev extra) for repeated rounds and
+        statistics; without it the benchmark tests still check their results.
+        """
+        def run(function, *args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            run.seconds = time.perf_counter() - start
+            return result
+        return run
@@ -0,0 +1,71 @@
+"""
+Tests for batch conversion with PhotoConverter.convert_many
+"""
+
+from PIL import Image
+
+from photo_converter import BatchControl, PhotoConverter
+
+
+def make_pairs(make_image, tmp_path, count, extension='.png'):
+    sources = [make_image(f"in/{i}.jpg", (160, 120)) for i in range(count)]
+    return [(src, tmp_path / 'out' / f"{src.stem}{extension}") for src in sources]
+
+
+def test_serial_batch_converts_every_file(make_image, tmp_path):
+    pairs = make_pairs(make_image, tmp_path, 3)
+    (tmp_path / 'out').mkdir()
+    converter = PhotoConverter()
+    
+    results = list(converter.convert_many(pairs, workers=1))
+    
+    assert len(results) == 3
+    assert all(result.success for result in results)
+    assert converter.converted_count == 3 and converter.failed_count == 0
+    for _, output in pairs:
+        assert Image.open(output).format == 'PNG'
+
+
+def test_parallel_batch_with_prefetch_and_write_threads(make_image, tmp_path):
+    pairs = make_pairs(make_image, tmp_path, 4, '.webp')
+    (tmp_path / 'out').mkdir()
+    converter = PhotoConverter()
+    
+    results = list(converter.convert_many(pairs, workers=2, prefetch=2, write_threads=1,
+                                          hash_sources=True, resize=(80, 60)))
+    
+    assert sorted(result.input_path for result in results) == sorted(src for src, _ in pairs)
+    assert all(result.success for result in results)
+    assert all(result.source_sha256 and len(result.source_sha256) == 64 for result in results)
+    for _, output in pairs:
+        assert Image.open(output).size == (80, 60)
+
+
+def test_failed_file_does_not_stop_batch(make_image, tmp_path):
+    pairs = make_pairs(make_image, tmp_path, 2)
+    broken = tmp_path / 'in' / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+    pairs.append((broken, tmp_path / 'out' / 'broken.png'))
+    (tmp_path / 'out').mkdir()
+    converter = PhotoConverter()
+    
+    results = {result.input_path: result for result in converter.convert_many(pairs, workers=2)}
+    
+    assert not results[broken].success
+    assert converter.converted_count == 2 and converter.failed_count == 1
+    assert not (tmp_path / 'out' / 'broken.png').exists()
+
+
+def test_cancelled_batch_starts_no_more_files(make_image, tmp_path):
+    pairs = make_pairs(make_image, tmp_path, 5)
+    (tmp_path / 'out').mkdir()
+    control = BatchControl()
+    converter = PhotoConverter()
+    
+    results = []
+    for result in converter.convert_many(pairs, workers=1, control=control):
+        results.append(result)
+        control.cancel()
+    
+    assert len(results) == 1
+    assert sum(1 for _, output in pairs if output.exists()) == 1
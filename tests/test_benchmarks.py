@@ -0,0 +1,66 @@
+"""
+Benchmarks for the decode, resize and encode stages, per format.
+
+Run with pytest-benchmark installed (``pip install -e .[dev]``) to get
+timing statistics, e.g. ``python -m pytest tests/test_benchmarks.py
+--benchmark-only``; without it each case runs once as a plain test.
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from photo_converter import PhotoConverter
+
+SOURCE_SIZE = (1600, 1200)
+RESIZE_BOX = (400, 300)
+FORMATS = ['.jpg', '.png', '.webp', '.tiff']
+
+
+@pytest.fixture(scope='module')
+def sources(tmp_path_factory):
+    """One photo-like source per format, plus an uncompressed one for encode cases"""
+    from photo_converter_bench import synthesize_image
+    directory = tmp_path_factory.mktemp('bench')
+    paths = {}
+    for extension in FORMATS + ['.bmp']:
+        paths[extension] = directory / f"source{extension}"
+        synthesize_image(paths[extension], SOURCE_SIZE)
+    return paths
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_decode(benchmark, sources, extension):
+    converter = PhotoConverter()
+    data = sources[extension].read_bytes()
+    
+    def decode():
+        img = converter.open_image(sources[extension], data)
+        img.load()
+        return img
+    
+    img = benchmark(decode)
+    assert img.size == SOURCE_SIZE
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_resize(benchmark, sources, extension):
+    converter = PhotoConverter()
+    data = sources[extension].read_bytes()
+    output = benchmark(converter.convert_bytes, data, extension, source_name=sources[extension].name,
+                       resize=RESIZE_BOX, resize_mode='fit')
+    assert output is not None
+    assert Image.open(io.BytesIO(output)).size == RESIZE_BOX
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_encode(benchmark, sources, extension):
+    # A BMP source costs next to nothing to decode, so this times the encoder
+    converter = PhotoConverter()
+    data = sources['.bmp'].read_bytes()
+    output = benchmark(converter.convert_bytes, data, extension, source_name='source.bmp')
+    assert output is not None
+    img = Image.open(io.BytesIO(output))
+    assert img.format == PhotoConverter.SUPPORTED_FORMATS[extension]
+    assert img.size == SOURCE_SIZE
@@ -0,0 +1,92 @@
+"""
+Tests for the shared output cache
+"""
+
+import os
+import stat
+import time
+
+from photo_converter import PhotoConverter
+from photo_converter_cache import OutputCache
+
+
+def test_second_conversion_is_served_from_cache(make_image, tmp_path):
+    source = make_image('photo.jpg')
+    cache_dir = tmp_path / 'cache'
+    converter = PhotoConverter()
+    
+    assert converter.convert_image(source, tmp_path / 'first.webp', output_cache=str(cache_dir))
+    assert OutputCache(cache_dir).stats()['entries'] == 1
+    assert converter.convert_image(source, tmp_path / 'second.webp', output_cache=str(cache_dir))
+    
+    assert (tmp_path / 'first.webp').read_bytes() == (tmp_path / 'second.webp').read_bytes()
+    assert OutputCache(cache_dir).stats()['entries'] == 1
+
+
+def test_different_options_miss(make_image, tmp_path):
+    source = make_image('photo.jpg')
+    cache_dir = tmp_path / 'cache'
+    converter = PhotoConverter()
+    
+    converter.convert_image(source, tmp_path / 'a.webp', quality=80, output_cache=str(cache_dir))
+    converter.convert_image(source, tmp_path / 'b.webp', quality=40, output_cache=str(cache_dir))
+    
+    assert OutputCache(cache_dir).stats()['entries'] == 2
+
+
+def test_store_and_fetch(tmp_path):
+    cache = OutputCache(tmp_path / 'cache')
+    key = cache.key(b'source bytes', {'quality': 80})
+    
+    assert cache.fetch(key, 1) is None
+    cache.store(key, 0, b'encoded')
+    cached = cache.fetch(key, 1)
+    
+    assert cached is not None and cached[0].read_bytes() == b'encoded'
+    assert key != cache.key(b'source bytes', {'quality': 81})
+
+
+def test_objects_and_linked_outputs_follow_umask(tmp_path):
+    cache = OutputCache(tmp_path / 'cache', link=True)
+    key = cache.key(b'source bytes', {})
+    cache.store(key, 0, b'encoded')
+    output = tmp_path / 'output.jpg'
+    
+    cache.place(cache.fetch(key, 1)[0], output)
+    
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(output.stat().st_mode) == 0o666 & ~umask
+    assert output.read_bytes() == b'encoded'
+
+
+def test_place_leaves_no_temp_file_on_failure(tmp_path):
+    cache = OutputCache(tmp_path / 'cache')
+    output = tmp_path / 'output.jpg'
+    
+    try:
+        cache.place(tmp_path / 'missing-object', output)
+    except OSError:
+        pass
+    
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = OutputCache(tmp_path / 'cache')
+    keys = [cache.key(bytes([i]), {}) for i in range(3)]
+    now = time.time()
+    for age, key in zip((300, 200, 100), keys):
+        cache.store(key, 0, b'x' * 1000)
+        object_path = cache.fetch(key, 1)[0]
+        os.utime(object_path, (now - age, now - age))
+    
+    removed, freed = cache.prune(max_bytes=2000)
+    
+    assert (removed, freed) == (1, 1000)
+    assert cache.fetch(keys[0], 1) is None
+    assert cache.fetch(keys[2], 1) is not None
+    
+    removed, _ = cache.prune(max_age=150)
+    assert removed == 1
+    assert cache.stats()['objects'] == 1
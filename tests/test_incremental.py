@@ -0,0 +1,67 @@
+"""
+Tests for incremental batches and the conversion manifest
+"""
+
+import os
+
+from click.testing import CliRunner
+
+from photo_converter import ConversionManifest, main
+
+
+def run_batch(input_dir, output_dir, *extra):
+    result = CliRunner().invoke(main, [str(input_dir), '--batch', '-o', str(output_dir), '-f', 'png',
+                                       '--incremental', '--workers', '1', *extra])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_second_run_skips_unchanged_files(make_image, tmp_path):
+    input_dir = tmp_path / 'in'
+    output_dir = tmp_path / 'out'
+    make_image('a.jpg', directory=input_dir)
+    make_image('b.jpg', directory=input_dir)
+    
+    run_batch(input_dir, output_dir)
+    manifest = ConversionManifest.for_output_dir(output_dir)
+    assert (output_dir / 'a.png').exists() and (output_dir / 'b.png').exists()
+    assert len(manifest.entries) == 2
+    
+    assert 'Skipped 2 unchanged files' in run_batch(input_dir, output_dir)
+
+
+def test_changed_source_and_deleted_output_are_converted_again(make_image, tmp_path):
+    input_dir = tmp_path / 'in'
+    output_dir = tmp_path / 'out'
+    make_image('a.jpg', directory=input_dir)
+    make_image('b.jpg', directory=input_dir)
+    make_image('c.jpg', directory=input_dir)
+    run_batch(input_dir, output_dir)
+    
+    make_image('a.jpg', (200, 100), directory=input_dir)
+    (output_dir / 'b.png').unlink()
+    output = run_batch(input_dir, output_dir)
+    
+    assert 'Skipped 1 unchanged files' in output
+    assert (output_dir / 'b.png').exists()
+
+
+def test_touched_but_identical_source_is_skipped(make_image, tmp_path):
+    input_dir = tmp_path / 'in'
+    output_dir = tmp_path / 'out'
+    source = make_image('a.jpg', directory=input_dir)
+    run_batch(input_dir, output_dir)
+    
+    stat = source.stat()
+    os.utime(source, (stat.st_atime + 60, stat.st_mtime + 60))
+    
+    assert 'Skipped 1 unchanged files' in run_batch(input_dir, output_dir)
+
+
+def test_different_options_convert_again(make_image, tmp_path):
+    input_dir = tmp_path / 'in'
+    output_dir = tmp_path / 'out'
+    make_image('a.jpg', directory=input_dir)
+    run_batch(input_dir, output_dir)
+    
+    assert 'Skipped' not in run_batch(input_dir, output_dir, '--resize', '50x50')
@@ -0,0 +1,77 @@
+"""
+Tests for renditions and resize validation
+"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from photo_converter import PhotoConverter, Rendition, check_resize, load_renditions, rendition_path
+
+
+def test_renditions_are_written_from_one_source(make_image, tmp_path):
+    source = make_image('photo.jpg', (800, 600))
+    renditions = [Rendition.parse('thumb:webp:160x160'), Rendition.parse('web:jpg:400x400:80')]
+    converter = PhotoConverter()
+    
+    # With renditions the output path is a base name without extension
+    assert converter.convert_image(source, tmp_path / 'photo', resize=(400, 400),
+                                   resize_mode='fit', renditions=renditions)
+    
+    thumb = Image.open(rendition_path(tmp_path / 'photo', renditions[0]))
+    web = Image.open(rendition_path(tmp_path / 'photo', renditions[1]))
+    assert (thumb.format, thumb.size) == ('WEBP', (160, 120))
+    assert (web.format, web.size) == ('JPEG', (400, 300))
+    assert not (tmp_path / 'photo').exists()
+
+
+def test_rendition_resize_mode(make_image, tmp_path):
+    source = make_image('photo.jpg', (800, 600))
+    square = Rendition.from_dict({'name': 'square', 'format': 'png', 'size': [100, 100], 'mode': 'fill'})
+    
+    assert PhotoConverter().convert_image(source, tmp_path / 'photo', renditions=[square])
+    
+    assert Image.open(tmp_path / 'photo_square.png').size == (100, 100)
+
+
+def test_parse():
+    assert Rendition.parse('thumb:webp:320x320:80') == Rendition('thumb', '.webp', (320, 320), 80)
+    assert Rendition.parse('full:jpg') == Rendition('full', '.jpg')
+
+
+@pytest.mark.parametrize('spec', ['thumb', 'thumb:webp:0x10', 'thumb:webp:10x10:101', 'a:b:c:d:e'])
+def test_parse_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        Rendition.parse(spec)
+
+
+def test_load_renditions_from_json(tmp_path):
+    preset = tmp_path / 'renditions.json'
+    preset.write_text(json.dumps({'renditions': [
+        {'name': 'thumb', 'format': 'webp', 'size': '320x320', 'quality': 75},
+        {'name': 'banner', 'format': 'jpg', 'size': [1200, None], 'mode': 'width'},
+    ]}))
+    
+    thumb, banner = load_renditions(preset)
+    
+    assert thumb == Rendition('thumb', '.webp', (320, 320), 75)
+    assert banner.resize == (1200, None) and banner.resize_mode == 'width'
+
+
+@pytest.mark.parametrize('resize, mode', [
+    ((None, None), 'exact'),
+    ((0, 100), 'fit'),
+    ((None, 100), 'width'),
+    ((100, None), 'height'),
+    ((100, None), 'fill'),
+    ((None, 100), 'max-pixels'),
+])
+def test_check_resize_rejects(resize, mode):
+    with pytest.raises(ValueError):
+        check_resize(resize, mode)
+
+
+def test_from_dict_rejects_size_missing_a_side_its_mode_needs():
+    with pytest.raises(ValueError):
+        Rendition.from_dict({'name': 'tall', 'format': 'jpg', 'size': [None, 500], 'mode': 'width'})
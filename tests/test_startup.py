@@ -0,0 +1,22 @@
+"""
+Startup budget: importing photo_converter must stay cheap.
+
+Codec and UI modules are imported lazily so that --help, scans and
+up-to-date incremental runs start quickly. PHOTO_CONVERTER_MAX_STARTUP_MS
+overrides the import budget for slow CI machines.
+"""
+
+import os
+
+from photo_converter_bench import measure_startup
+
+MAX_IMPORT_MS = float(os.environ.get('PHOTO_CONVERTER_MAX_STARTUP_MS', 150))
+
+
+def test_import_is_lazy_and_within_budget():
+    report = measure_startup(runs=3)
+    
+    assert report['eager_modules'] == [], f"imported eagerly: {report['eager_modules']}"
+    assert report['import_ms'] <= MAX_IMPORT_MS, (
+        f"importing photo_converter took {report['import_ms']} ms (budget {MAX_IMPORT_MS} ms); "
+        f"heaviest imports: {report['heaviest_imports']}")